@@ -0,0 +1,101 @@
+"""用模拟延迟的本地服务器测试 PagedBookClient 的分页并发下载
+
+用法: python benchmarks/bench_api_connector.py [--words 20000] [--page-size 500] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from synthetic import make_book  # noqa: E402
+from api_connector import PagedBookClient  # noqa: E402
+
+
+def start_server(book, latency, fail_every=0):
+    """启动分页词库服务器，每个请求延迟 latency 秒，每 fail_every 个请求返回一次 503"""
+    counter = {'requests': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            counter['requests'] += 1
+            time.sleep(latency)
+            if fail_every and counter['requests'] % fail_every == 0:
+                self.send_response(503)
+                self.end_headers()
+                return
+            query = parse_qs(urlparse(self.path).query)
+            page = int(query.get('page', ['1'])[0])
+            size = int(query.get('page_size', ['500'])[0])
+            body = json.dumps({
+                'page': page,
+                'total_pages': (len(book) + size - 1) // size,
+                'words': book[(page - 1) * size:page * size],
+            }, ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counter
+
+
+class Sink:
+    """记录 extend_words 调用时间的 DataManager 替身"""
+
+    def __init__(self):
+        self.count = 0
+        self.first_page_at = None
+
+    def extend_words(self, entries):
+        if self.first_page_at is None:
+            self.first_page_at = time.perf_counter()
+        self.count += len(entries)
+
+    def finish_extend(self):
+        pass
+
+
+def run(url, page_size, concurrency):
+    client = PagedBookClient(url, page_size=page_size, concurrency=concurrency, backoff=0.05)
+    sink = Sink()
+    start = time.perf_counter()
+    asyncio.run(client.load_into(sink))
+    total = time.perf_counter() - start
+    client.close()
+    return sink.count, sink.first_page_at - start, total, client.requests_sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', type=int, default=20000)
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--fail-every', type=int, default=0, help="每 N 个请求失败一次，用于测试重试")
+    args = parser.parse_args()
+
+    server, _ = start_server(make_book(args.words), args.latency, args.fail_every)
+    url = f"http://127.0.0.1:{server.server_port}/words"
+    try:
+        for concurrency in (1, 4, 8):
+            count, first, total, sent = run(url, args.page_size, concurrency)
+            print(f"并发 {concurrency}: {count} 个词条, 首页 {first * 1000:.0f} ms, "
+                  f"总计 {total * 1000:.0f} ms, 请求 {sent} 次")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""对词库加载、进度保存和选词等热点路径计时，输出 JSON 并可与基线比较
+
+用法: python benchmarks/bench_hot_paths.py [--sizes 5000 50000 500000] [--repeat 5]
+                                          [--output results.json] [--baseline 上次的results.json]
+
+合成词库和进度文件按 --seed 生成，同一参数下每次运行的数据相同；
+指定 --data-dir 时生成的数据会保留下来供下次复用。
+与基线相比中位数变慢超过 --threshold 的项目视为退化，此时退出码为 1。
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from synthetic import write_book  # noqa: E402
+from book_compiler import compile_book  # noqa: E402
+from memorization import MemoryAlgorithm  # noqa: E402
+from word_manager import DataManager  # noqa: E402
+
+try:
+    from main import get_recommended_words  # noqa: E402
+except ImportError as e:  # main 依赖的输入模块在当前平台不可用
+    get_recommended_words = None
+    RECOMMEND_ERROR = str(e)
+
+BOOK_NAME = "KaoYanluan_1.json"
+# 每个操作在一次计时中连续调用的次数，结果按单次调用折算
+CALLS = {
+    'update_word_status': 200,
+    'get_review_words': 200,
+    'get_statistics': 50,
+    'get_recommended_words': 50,
+    'update_memory': 3,  # 每次调用都会重写整个 memory_stats.json
+}
+
+
+def make_fixture(directory, size, seed):
+    """生成词库、进度文件和复习计划，已存在时直接复用"""
+    book = os.path.join(directory, f"book_{size}.json")
+    progress_file = os.path.join(directory, f"progress_{size}.json")
+    stats_file = os.path.join(directory, f"memory_stats_{size}.json")
+    if all(os.path.exists(path) for path in (book, progress_file, stats_file)):
+        return book, progress_file, stats_file
+
+    write_book(book, size, seed)
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    words, wrong, stats = [], [], {}
+    for i in range(size):
+        head = "w%06d" % i
+        progress = {'word': head, 'last_reviewed': None, 'review_count': 0,
+                    'correct_count': 0, 'difficulty_level': 0}
+        if rng.random() < 0.3:  # 约 30% 的单词学过
+            total = rng.randint(1, 12)
+            correct = rng.randint(0, total)
+            reviewed = start + timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+            progress.update(last_reviewed=reviewed.isoformat(), review_count=total,
+                            correct_count=correct, difficulty_level=total - correct)
+            if correct < total and rng.random() < 0.2:
+                wrong.append(progress)
+            stats[head] = {'level': rng.randint(0, 4),
+                           'next_review': (reviewed + timedelta(days=rng.randint(1, 45))).isoformat(),
+                           'correct_count': correct, 'total_count': total}
+        words.append(progress)
+    with open(progress_file, 'w', encoding='utf-8') as f:
+        json.dump({'book': BOOK_NAME, 'books': {BOOK_NAME: {
+            'words': words, 'wrong_words': wrong, 'review_history': {}}}, 'journal_seq': 0},
+            f, ensure_ascii=False, indent=2)
+    with open(stats_file, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+    return book, progress_file, stats_file
+
+
+def measure(run, repeat, calls=1, setup=None):
+    """重复 repeat 次，每次先执行 setup (不计时)，返回单次调用耗时的统计 (秒)"""
+    samples = []
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        gc.collect()
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            run(state)
+            samples.append((time.perf_counter() - started) / calls)
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'repeat': repeat,
+        'calls': calls,
+    }
+
+
+def bench_size(size, data_dir, repeat, seed):
+    book_src, progress_src, stats_src = make_fixture(data_dir, size, seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as work:
+        # DataManager 和 MemoryAlgorithm 使用相对路径 data/...
+        os.makedirs(os.path.join(work, 'data'))
+        book = os.path.join(work, 'data', BOOK_NAME)
+        shutil.copyfile(book_src, book)
+        shutil.copyfile(progress_src, os.path.join(work, 'data', 'progress.json'))
+        shutil.copyfile(stats_src, os.path.join(work, 'data', 'memory_stats.json'))
+        cwd = os.getcwd()
+        os.chdir(work)
+        try:
+            def empty_manager():
+                manager = DataManager()
+                manager._begin_book(BOOK_NAME)
+                return manager
+
+            results['load_local'] = measure(lambda m: m.load_local(book), repeat, setup=empty_manager)
+
+            wbk = compile_book(book)
+            results['load_local_compiled'] = measure(lambda m: m.load_local(book), repeat,
+                                                     setup=empty_manager)
+            os.remove(wbk)
+
+            def loaded_manager():
+                manager = empty_manager()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    manager.load_local(book)
+                return manager
+
+            results['load_progress'] = measure(lambda m: m.load_progress(), repeat,
+                                               setup=loaded_manager)
+
+            memory = MemoryAlgorithm()
+            results['load_stats'] = measure(lambda _: memory.load_stats(), repeat)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                manager = DataManager(memory=memory)
+                manager.load_data(book)
+            manager.journal.compact_every = sys.maxsize  # 只测追加日志，快照单独计时
+            results['save_progress'] = measure(lambda _: manager.save_progress(), repeat)
+
+            rng = random.Random(seed)
+            picks = [rng.choice(manager.words) for _ in range(CALLS['update_word_status'])]
+
+            def answer(_):
+                for word in picks:
+                    manager.update_word_status(word, rng.random() < 0.7)
+            results['update_word_status'] = measure(answer, repeat, CALLS['update_word_status'])
+
+            def review(_):
+                for _ in range(CALLS['get_review_words']):
+                    manager.get_review_words(10)
+            results['get_review_words'] = measure(review, repeat, CALLS['get_review_words'])
+
+            def stats(_):
+                for _ in range(CALLS['get_statistics']):
+                    manager.get_statistics()
+            results['get_statistics'] = measure(stats, repeat, CALLS['get_statistics'])
+
+            if get_recommended_words is not None:
+                managers = {'data': manager, 'memory': memory}
+
+                def recommend(_):
+                    for _ in range(CALLS['get_recommended_words']):
+                        get_recommended_words(managers)
+                results['get_recommended_words'] = measure(recommend, repeat,
+                                                           CALLS['get_recommended_words'])
+            else:
+                results['get_recommended_words'] = {'skipped': RECOMMEND_ERROR}
+
+            def remember(_):
+                for word in picks[:CALLS['update_memory']]:
+                    memory.update_memory(word.word, True)
+            results['update_memory'] = measure(remember, repeat, CALLS['update_memory'])
+
+            manager.cleanup()
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """逐项比较中位数，返回退化的项目"""
+    regressions = []
+    print(f"\n{'规模':>8} {'操作':<24} {'基线':>12} {'本次':>12} {'变化':>8}")
+    for size, ops in results['results'].items():
+        for op, current in ops.items():
+            previous = baseline.get('results', {}).get(size, {}).get(op)
+            if not previous or 'median' not in previous or 'median' not in current:
+                continue
+            ratio = current['median'] / previous['median'] if previous['median'] else float('inf')
+            flag = ''
+            if ratio > 1 + threshold:
+                flag = ' !'
+                regressions.append((size, op, ratio))
+            print(f"{size:>8} {op:<24} {previous['median'] * 1e3:>10.3f}ms "
+                  f"{current['median'] * 1e3:>10.3f}ms {ratio - 1:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 50000, 500000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', help="合成数据目录，默认使用临时目录")
+    parser.add_argument('--output', help="结果 JSON 文件")
+    parser.add_argument('--baseline', help="用于比较的上次结果 JSON 文件")
+    parser.add_argument('--threshold', type=float, default=0.2, help="中位数变慢超过该比例视为退化")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        data_dir = args.data_dir or stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(data_dir, exist_ok=True)
+        results = {'environment': environment(), 'seed': args.seed, 'results': {}}
+        for size in args.sizes:
+            ops = bench_size(size, data_dir, args.repeat, args.seed)
+            results['results'][str(size)] = ops
+            print(f"\n词条数: {size}")
+            for op, timing in ops.items():
+                if 'skipped' in timing:
+                    print(f"  {op:<24} 跳过: {timing['skipped']}")
+                else:
+                    print(f"  {op:<24} 中位数 {timing['median'] * 1e3:10.3f} ms  "
+                          f"最小 {timing['min'] * 1e3:10.3f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} 项变慢超过 {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
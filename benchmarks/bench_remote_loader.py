@@ -0,0 +1,116 @@
+"""用本地 http.server 替身测试 RemoteBookLoader 的流式下载和条件请求缓存
+
+依次运行: 首次下载 (边下载边解析)、再次加载 (304，读取本地缓存)、
+读取部分词条后中途停止 (不应留下 .tmp 文件)、服务器返回截断的数据 (应报错且不写缓存)。
+
+用法: python benchmarks/bench_remote_loader.py [--words 20000] [--latency 0.0005]
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from synthetic import make_book  # noqa: E402
+from remote_loader import RemoteBookLoader  # noqa: E402
+
+ETAG = '"book-v1"'
+CHUNK = 64 * 1024
+
+
+def start_server(body, latency):
+    """启动词库服务器，分块发送响应体，每块之间延迟 latency 秒
+
+    请求带有匹配的 If-None-Match 时返回 304；路径为 /truncated 时只发送一半的数据。
+    """
+    counter = {'200': 0, '304': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.headers.get('If-None-Match') == ETAG:
+                counter['304'] += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            counter['200'] += 1
+            data = body[:len(body) // 2] if self.path == '/truncated' else body
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            try:
+                for start in range(0, len(data), CHUNK):
+                    self.wfile.write(data[start:start + CHUNK])
+                    time.sleep(latency)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # 客户端中途停止读取
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counter
+
+
+def timed_load(loader, url):
+    """返回 (词条数, 首个词条耗时, 总耗时)"""
+    start = time.perf_counter()
+    first, count = None, 0
+    for _ in loader.iter_entries(url):
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    return count, first, time.perf_counter() - start
+
+
+def leftover_tmp(cache_dir):
+    return [name for name in os.listdir(cache_dir) if name.endswith('.tmp')] if os.path.isdir(cache_dir) else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', type=int, default=20000)
+    parser.add_argument('--latency', type=float, default=0.0005, help="每 64 KiB 数据块之间的延迟 (秒)")
+    args = parser.parse_args()
+
+    body = json.dumps(make_book(args.words), ensure_ascii=False).encode('utf-8')
+    server, counter = start_server(body, args.latency)
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            loader = RemoteBookLoader(cache_dir=cache_dir)
+
+            count, first, total = timed_load(loader, f"{base}/words")
+            print(f"首次下载: {count} 个词条 ({len(body) / 1024 / 1024:.1f} MiB), "
+                  f"首个词条 {first * 1000:.0f} ms, 总计 {total * 1000:.0f} ms")
+
+            count, first, total = timed_load(loader, f"{base}/words")
+            print(f"再次加载 (304): {count} 个词条, 首个词条 {first * 1000:.0f} ms, 总计 {total * 1000:.0f} ms")
+
+            entries = loader.iter_entries(f"{base}/partial")
+            taken = list(itertools.islice(entries, 10))
+            entries.close()
+            print(f"中途停止: 读取 {len(taken)} 个词条, 残留临时文件 {leftover_tmp(cache_dir)}")
+
+            try:
+                timed_load(loader, f"{base}/truncated")
+                print("截断数据: 未报错")
+            except ValueError as e:
+                print(f"截断数据: {e}, 残留临时文件 {leftover_tmp(cache_dir)}")
+
+            loader.close()
+            print(f"服务器响应: 200 x {counter['200']}, 304 x {counter['304']}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""用 tracemalloc 统计词库加载后 Word 对象占用的内存
+
+用法: python benchmarks/memory_report.py [--words 50000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from synthetic import write_book  # noqa: E402
+from word_manager import DataManager, Word  # noqa: E402
+
+
+class EagerWord:
+    """旧版 Word 的等价实现: 初始化时解析全部字段，用作对照"""
+
+    def __init__(self, data):
+        self.word = data.get("headWord", "")
+        self.word_rank = data.get("wordRank", 0)
+        content = data.get("content", {}).get("word", {}).get("content", {})
+        self.phonetics = content.get("usphone", "")
+        self.uk_phonetics = content.get("ukphone", "")
+        self.examples = content.get("sentence", {}).get("sentences", [])
+        self.translation = content.get("trans", [])
+        self.synonyms = content.get("syno", {}).get("synos", [])
+        self.phrases = content.get("phrase", {}).get("phrases", [])
+        self.memory_method = content.get("remMethod", {}).get("val", "")
+        self.related_words = content.get("relWord", {}).get("rels", [])
+        self.last_reviewed = None
+        self.review_count = 0
+        self.correct_count = 0
+        self.difficulty_level = 0
+
+
+def measure(func):
+    """返回 func() 执行后新增的内存和峰值 (字节)"""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book = os.path.join(tmp, 'book.json')
+        write_book(book, args.words)
+
+        manager = DataManager(progress_file=os.path.join(tmp, 'progress.json'))
+        _, total, peak = measure(lambda: manager.load_local(book))
+        raw = [word.data for word in manager.words]
+
+        _, lazy_bytes, _ = measure(lambda: [Word(entry) for entry in raw])
+        _, eager_bytes, _ = measure(lambda: [EagerWord(entry) for entry in raw])
+
+    print(f"词条数: {args.words}")
+    print(f"load_local 总占用: {total / 1024 / 1024:.1f} MiB (峰值 {peak / 1024 / 1024:.1f} MiB)")
+    print(f"Word 对象 (__slots__, 延迟解析): {lazy_bytes / 1024 / 1024:.2f} MiB, "
+          f"每个 {lazy_bytes / args.words:.0f} B")
+    print(f"旧版 Word (每词一个 __dict__):  {eager_bytes / 1024 / 1024:.2f} MiB, "
+          f"每个 {eager_bytes / args.words:.0f} B")
+    print(f"节省: {(eager_bytes - lazy_bytes) / 1024 / 1024:.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
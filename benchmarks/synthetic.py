@@ -0,0 +1,42 @@
+"""按 KaoYanluan_1.json 的词条结构生成合成词库"""
+import json
+import random
+
+TRANSLATIONS = ["取消， 撤销； 删去", "反抗， 起义； 反感", "专家， 专科医生", "地毯， 毛毯",
+                "沉思， 冥想", "坚持， 持续", "开始， 着手", "巧妙的， 机灵的"]
+
+
+def make_entry(index, rng=random):
+    """生成第 index 个合成词条"""
+    head = "w%06d" % index
+    return {
+        "wordRank": index + 1,
+        "headWord": head,
+        "content": {"word": {"wordHead": head, "wordId": f"KaoYanluan_1_{index + 1}", "content": {
+            "sentence": {"sentences": [
+                {"sContent": f"The {head} appeared in sentence number {k}.", "sCn": f"这是第{k}个例句。"}
+                for k in range(2)
+            ], "desc": "例句"},
+            "usphone": f"{head}-us",
+            "ukphone": f"{head}-uk",
+            "syno": {"synos": [{"pos": "vt", "tran": rng.choice(TRANSLATIONS),
+                                "hwds": [{"w": f"{head}s"}]}], "desc": "同近"},
+            "phrase": {"phrases": [{"pContent": f"{head} out", "pCn": "短语释义"}], "desc": "短语"},
+            "remMethod": {"val": f"{head} 的记忆方法", "desc": "记忆"},
+            "relWord": {"rels": [{"pos": "n", "words": [{"hwd": f"{head}ion", "tran": "名词形式"}]}],
+                        "desc": "同根"},
+            "trans": [{"tranCn": rng.choice(TRANSLATIONS), "pos": rng.choice(["vt", "n", "adj"]),
+                       "descCn": "中释"}],
+        }}},
+        "bookId": "KaoYanluan_1",
+    }
+
+
+def make_book(count, seed=0):
+    rng = random.Random(seed)
+    return [make_entry(i, rng) for i in range(count)]
+
+
+def write_book(path, count, seed=0):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(make_book(count, seed), f, ensure_ascii=False)
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class PagedBookClient:
+    """分页并发获取远程词库的 asyncio 客户端
+
+    约定接口: GET {base_url}?page=N&page_size=M 返回
+    {"words": [...], "page": N, "total_pages": P}，页码从 1 开始。
+    并发数由信号量限制，失败请求按指数退避重试，同一页的并发请求只发送一次。
+    HTTP 请求在线程池中通过共享的连接池会话执行。
+    """
+
+    def __init__(self, base_url: str, page_size: int = 500, concurrency: int = 4,
+                 retries: int = 3, backoff: float = 0.5, timeout=(5, 30),
+                 session: requests.Session = None):
+        self.base_url = base_url
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = session or self._create_session(concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="api-page")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[int, asyncio.Future] = {}
+        self.requests_sent = 0
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _get_page(self, page: int) -> Dict:
+        self.requests_sent += 1
+        response = self.session.get(self.base_url, params={'page': page, 'page_size': self.page_size},
+                                    timeout=self.timeout)
+        if 400 <= response.status_code < 500:
+            raise ValueError(f"远程数据加载失败: HTTP {response.status_code}")
+        response.raise_for_status()
+        return response.json()
+
+    async def _fetch_with_retry(self, page: int) -> Dict:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            async with self._semaphore:
+                try:
+                    return await loop.run_in_executor(self._executor, self._get_page, page)
+                except requests.RequestException:
+                    if attempt == self.retries:
+                        raise
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    async def fetch_page(self, page: int) -> Dict:
+        """获取一页数据，同一页的重复请求共享同一个结果"""
+        future = self._inflight.get(page)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_with_retry(page))
+            self._inflight[page] = future
+            future.add_done_callback(lambda _: self._inflight.pop(page, None))
+        return await asyncio.shield(future)
+
+    async def iter_pages(self) -> AsyncIterator[List[Dict]]:
+        """按页码顺序产出每页词条，第一页返回后其余页并发下载"""
+        first = await self.fetch_page(1)
+        yield first.get('words', [])
+        tasks = [asyncio.ensure_future(self.fetch_page(page))
+                 for page in range(2, first.get('total_pages', 1) + 1)]
+        try:
+            for task in tasks:
+                yield (await task).get('words', [])
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def load_into(self, data_manager, first_page: threading.Event = None) -> int:
+        """逐页把词条交给 DataManager.extend_words，返回词条总数"""
+        total = 0
+        async for entries in self.iter_pages():
+            data_manager.extend_words(entries)
+            total += len(entries)
+            if first_page is not None:
+                first_page.set()
+        data_manager.finish_extend()
+        return total
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+class BackgroundLoad:
+    """在后台线程的事件循环中运行 PagedBookClient.load_into"""
+
+    def __init__(self, client: PagedBookClient, data_manager):
+        self.client = client
+        self.data_manager = data_manager
+        self.first_page = threading.Event()
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.total = 0
+        self._thread = threading.Thread(target=self._run, name="api-loader", daemon=True)
+
+    def start(self) -> 'BackgroundLoad':
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            self.total = asyncio.run(self.client.load_into(self.data_manager, self.first_page))
+        except BaseException as e:
+            self.error = e
+            if self.first_page.is_set():
+                # 第一页之后失败: 已加载的单词照常使用，并提示用户
+                self.data_manager.finish_extend(error=e)
+        finally:
+            self.client.close()
+            self.first_page.set()
+            self.done.set()
+
+    def wait_first_page(self, timeout: float = None) -> None:
+        """等待第一页到达，失败时抛出后台线程中的异常"""
+        self.first_page.wait(timeout)
+        if self.error is not None and not self.data_manager.words:
+            raise Exception(f"远程数据加载失败: {self.error}")
+
+    def wait(self, timeout: float = None) -> bool:
+        return self.done.wait(timeout)
@@ -0,0 +1,145 @@
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import disk_cache
+
+# 缓存文件格式变化时递增，旧缓存自动重建
+TREE_VERSION = 2
+
+
+def tree_path(book_path: str) -> str:
+    """词库对应的 BK 树缓存文件路径"""
+    return os.path.splitext(book_path)[0] + '.bkt'
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein 编辑距离 (插入、删除、替换各计 1)
+
+    使用 Myers / Hyyrö 位并行算法: 较短的串的每个位置占整数的一位，
+    较长的串每个字符只需几次整数运算，比逐格动态规划快数倍。
+    """
+    if a == b:
+        return 0
+    if len(a) > len(b):
+        a, b = b, a
+    m = len(a)
+    if not m:
+        return len(b)
+    peq: Dict[str, int] = {}  # 字符 -> 在 a 中出现位置的位掩码
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for char in b:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+def max_typos(target: str) -> int:
+    """按答案长度允许的拼写错误数，短词必须完全正确"""
+    if len(target) <= 3:
+        return 0
+    if len(target) <= 7:
+        return 1
+    return 2
+
+
+def closest(answer: str, targets: Iterable[str]) -> Tuple[Optional[str], int]:
+    """返回与 answer 编辑距离最小的目标及距离，忽略大小写和首尾空白"""
+    answer = answer.strip().lower()
+    best, best_distance = None, -1
+    for target in targets:
+        distance = edit_distance(answer, target.strip().lower())
+        if best is None or distance < best_distance:
+            best, best_distance = target, distance
+            if distance == 0:
+                break
+    return best, best_distance
+
+
+class BKTree:
+    """以编辑距离为度量的 BK 树，用于查找与输入最接近的词头
+
+    节点按插入顺序存放在平铺数组中: words[i] 是节点 i 的词，
+    children[i] 是 {到子节点的距离: 子节点序号}。查询时按三角不等式
+    只访问距离在 [d - r, d + r] 范围内的子树。
+    """
+
+    def __init__(self):
+        self.words: List[str] = []
+        self.children: List[Dict[int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @classmethod
+    def build(cls, words: Iterable[str]) -> 'BKTree':
+        tree = cls()
+        for word in words:
+            tree.add(word)
+        return tree
+
+    def add(self, word: str) -> None:
+        word = word.lower()
+        if not self.words:
+            self.words.append(word)
+            self.children.append({})
+            return
+        node = 0
+        while True:
+            distance = edit_distance(word, self.words[node])
+            if distance == 0:
+                return  # 重复的词只保留一个节点
+            child = self.children[node].get(distance)
+            if child is None:
+                self.children[node][distance] = len(self.words)
+                self.words.append(word)
+                self.children.append({})
+                return
+            node = child
+
+    def search(self, word: str, radius: int = 2, limit: int = 5) -> List[Tuple[int, str]]:
+        """返回编辑距离不超过 radius 的词，按 (距离, 词) 排序"""
+        if not self.words:
+            return []
+        word = word.lower()
+        matches = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            distance = edit_distance(word, self.words[node])
+            if distance <= radius:
+                matches.append((distance, self.words[node]))
+            for child_distance, child in self.children[node].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        matches.sort()
+        return matches[:limit]
+
+    def nearest(self, word: str, max_radius: int = 2, limit: int = 5) -> List[Tuple[int, str]]:
+        """从半径 1 开始逐步放宽，找到结果即返回，近处有结果时不必搜索大半径"""
+        for radius in range(1, max_radius + 1):
+            matches = self.search(word, radius, limit)
+            if matches:
+                return matches
+        return []
+
+
+def load_or_build_tree(source_path: str, words: Iterable[str], cache_path: Optional[str] = None) -> BKTree:
+    """读取词库的 BK 树缓存，缓存失效时重新构建并写回"""
+    return disk_cache.load_or_build(cache_path or tree_path(source_path),
+                                    disk_cache.source_key(source_path, TREE_VERSION),
+                                    lambda: BKTree.build(words))
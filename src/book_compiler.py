@@ -0,0 +1,203 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, Optional
+
+from json_stream import iter_book
+
+# 文件结构:
+#   文件头   MAGIC | 词条数 | 词条表偏移 | 源文件大小 | 源文件修改时间 | 源文件摘要
+#   词条区   每个词条的 UTF-8 JSON，后接词头字符串
+#   词条表   按词库顺序，每项 (词条偏移, 词条长度, 词头偏移, 词头长度)
+#   词头索引 按词头排序的词条序号，用于二分查找
+# 重复的词头在编译时只保留第一个，词头索引中每个词头只出现一次
+MAGIC = b'WBK4'
+HEADER = struct.Struct('<4sIQQQq16s')
+MTIME = struct.Struct('<q')
+MTIME_OFFSET = struct.calcsize('<4sIQQQ')
+ENTRY = struct.Struct('<QIQH')
+POSITION = struct.Struct('<I')
+
+
+def compiled_path(json_path: str) -> str:
+    """词库 JSON 对应的编译文件路径"""
+    return os.path.splitext(json_path)[0] + '.wbk'
+
+
+def _digest(path: str, chunk_size: int = 1 << 20) -> bytes:
+    """分块计算文件内容摘要"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def is_fresh(json_path: str, book_path: str) -> bool:
+    """编译文件存在且与原始 JSON 一致
+
+    先比较文件头中记录的源文件大小和修改时间；只有修改时间变了而大小相同时
+    (例如重新检出或复制) 才计算内容摘要，内容未变则更新记录的修改时间。
+    """
+    if not os.path.exists(book_path):
+        return False
+    if json_path == book_path or not os.path.exists(json_path):
+        return True
+    try:
+        with open(book_path, 'rb') as f:
+            magic, _, _, _, size, mtime, digest = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return False
+    if magic != MAGIC:
+        return False  # 旧版本的编译文件，重新编译
+    stat = os.stat(json_path)
+    if (stat.st_size, stat.st_mtime_ns) == (size, mtime):
+        return True
+    if stat.st_size != size:
+        return False
+    if _digest(json_path) != digest:
+        return False
+    try:
+        with open(book_path, 'r+b') as f:
+            f.seek(MTIME_OFFSET)
+            f.write(MTIME.pack(stat.st_mtime_ns))
+    except OSError:
+        pass
+    return True
+
+
+def compile_book(json_path: str, book_path: Optional[str] = None) -> str:
+    """将 JSON 词库编译为可按序号随机读取词条的二进制文件，返回输出路径
+
+    词条边读取边写入，同时计算源文件摘要，内存中只保留词条表和词头，
+    第一次编译大词库时不必把整个文件解析进内存。
+    """
+    book_path = book_path or compiled_path(json_path)
+    stat = os.stat(json_path)
+    digest = hashlib.blake2b(digest_size=16)
+    tmp_path = book_path + '.tmp'
+    entries: List[tuple] = []
+    heads: Dict[bytes, int] = {}  # 词头 -> 词条序号
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(b'\0' * HEADER.size)
+            for word_data in iter_book(json_path, on_chunk=digest.update):
+                blob = json.dumps(word_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                head = word_data["headWord"].encode('utf-8')
+                if head in heads:
+                    continue
+                heads[head] = len(entries)
+                blob_offset = f.tell()
+                f.write(blob)
+                head_offset = f.tell()
+                f.write(head)
+                entries.append((blob_offset, len(blob), head_offset, len(head)))
+
+            table_offset = f.tell()
+            for entry in entries:
+                f.write(ENTRY.pack(*entry))
+
+            index_offset = f.tell()
+            for head in sorted(heads):
+                f.write(POSITION.pack(heads[head]))
+
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, len(entries), table_offset, index_offset,
+                                stat.st_size, stat.st_mtime_ns, digest.digest()))
+        os.replace(tmp_path, book_path)
+    finally:
+        # 词库格式错误时不留下不完整的编译文件
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return book_path
+
+
+class CompiledBook:
+    """以 mmap 方式打开的编译词库，按需解码单个词条"""
+
+    def __init__(self, book_path: str, shared: Optional[Dict[str, Dict]] = None):
+        self.book_path = book_path
+        self.shared = shared  # 词头 -> 已解码词条，多本词库共享同一份
+        self._file = open(book_path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._table_offset, self._index_offset, _, _, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"无效的编译词库文件: {book_path}")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _entry(self, index: int) -> tuple:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return ENTRY.unpack_from(self._mm, self._table_offset + index * ENTRY.size)
+
+    def headword_bytes(self, index: int) -> bytes:
+        _, _, head_offset, head_len = self._entry(index)
+        return self._mm[head_offset:head_offset + head_len]
+
+    def headword(self, index: int) -> str:
+        return self.headword_bytes(index).decode('utf-8')
+
+    def headwords(self) -> List[str]:
+        """一次性读取全部词头 (按词库顺序)"""
+        mm = self._mm
+        table = mm[self._table_offset:self._table_offset + self.count * ENTRY.size]
+        return [mm[head_offset:head_offset + head_len].decode('utf-8')
+                for _, _, head_offset, head_len in ENTRY.iter_unpack(table)]
+
+    def entry(self, index: int) -> Dict:
+        """解码第 index 个词条，同一词头已被其他词库解码时直接复用"""
+        blob_offset, blob_len, head_offset, head_len = self._entry(index)
+        if self.shared is not None:
+            headword = self._mm[head_offset:head_offset + head_len].decode('utf-8')
+            entry = self.shared.get(headword)
+            if entry is None:
+                entry = json.loads(self._mm[blob_offset:blob_offset + blob_len].decode('utf-8'))
+                entry = self.shared.setdefault(headword, entry)
+            return entry
+        return json.loads(self._mm[blob_offset:blob_offset + blob_len].decode('utf-8'))
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """按词库顺序解码全部词条，不写入共享词条表 (用于一次性构建索引)"""
+        mm = self._mm
+        table = mm[self._table_offset:self._table_offset + self.count * ENTRY.size]
+        for blob_offset, blob_len, _, _ in ENTRY.iter_unpack(table):
+            yield json.loads(mm[blob_offset:blob_offset + blob_len].decode('utf-8'))
+
+    def _sorted_headword(self, rank: int) -> bytes:
+        """词头索引中第 rank 个 (按词头排序) 词条的词头"""
+        return self.headword_bytes(self._position(rank))
+
+    def _position(self, rank: int) -> int:
+        return POSITION.unpack_from(self._mm, self._index_offset + rank * POSITION.size)[0]
+
+    def find(self, headword: str) -> Optional[int]:
+        """在词头索引中二分查找，返回词条序号，只读取 O(log n) 个词头"""
+        target = headword.encode('utf-8')
+        rank = bisect.bisect_left(range(self.count), target, key=self._sorted_headword)
+        if rank < self.count and self._sorted_headword(rank) == target:
+            return self._position(rank)
+        return None
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("用法: python src/book_compiler.py <词库.json> [输出.wbk]")
+        sys.exit(1)
+    output = compile_book(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"已编译 {output}")
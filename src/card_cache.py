@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+
+class CardCache:
+    """预渲染卡片的 LRU 缓存
+
+    以 (词头, 显示配置) 为键保存渲染好的题面和答案文本。
+    显示配置变化时整体清空，旧配置下渲染的卡片不再有用。
+    卡片宽度固定，词条内容在多本词库间按词头共享且不会改变，因此不需要其他失效途径。
+    """
+
+    def __init__(self, size: int = 200):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.warmed = 0
+        self.invalidations = 0
+        self._settings_key: Hashable = None
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_settings(self, settings_key: Hashable) -> None:
+        if settings_key != self._settings_key:
+            if self._items:
+                self.invalidations += 1
+            self._items.clear()
+            self._settings_key = settings_key
+
+    def get(self, headword: str, settings_key: Hashable, render: Callable[[], object]):
+        """返回缓存的卡片，未命中时调用 render 生成"""
+        with self._lock:
+            self._check_settings(settings_key)
+            card = self._items.get(headword)
+            if card is not None:
+                self._items.move_to_end(headword)
+                self.hits += 1
+                return card
+        card = render()
+        with self._lock:
+            self.misses += 1
+            self._put(headword, settings_key, card)
+        return card
+
+    def warm(self, headword: str, settings_key: Hashable, render: Callable[[], object]) -> None:
+        """提前渲染卡片，已缓存时不做任何事"""
+        with self._lock:
+            self._check_settings(settings_key)
+            if headword in self._items:
+                return
+        card = render()
+        with self._lock:
+            self.warmed += 1
+            self._put(headword, settings_key, card)
+
+    def _put(self, headword: str, settings_key: Hashable, card) -> None:
+        if settings_key != self._settings_key:
+            return  # 渲染期间配置已变化
+        self._items[headword] = card
+        self._items.move_to_end(headword)
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """缓存命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'warmed': self.warmed,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'cached': len(self._items),
+            'capacity': self.size,
+        }
@@ -1,10 +1,203 @@
+import copy
 import json
 import os
+import time
+from dataclasses import dataclass, fields
+from typing import Tuple
+
+# 配置文件缺少的字段使用这里的默认值
+DEFAULT_CONFIG = {
+    "display": {
+        "show_translations": True,
+        "show_sentences": False,
+        "show_phonetics": False,
+        "show_phrases": False,
+        "show_memory_method": False,
+        "show_synonyms": False,
+        "show_tips": True
+    },
+    "mode": {
+        "default": "word",
+        "long_sentence_mode": True
+    },
+    "memorization": {
+        "algorithm": "spaced_repetition",
+        "intervals": [1, 3, 7, 15],
+        "mastery_threshold": 0.8
+    },
+    "word_database": {
+        "local_file": "data/word_database.json",
+        "remote_api": "https://api.example.com/words",
+        "source": "local",
+        "books": [],
+        "page_size": 500,
+        "concurrency": 4
+    },
+    "cache": {
+        "size": 100,
+        "prefetch": 20,
+        "background_prefetch": False,
+        "card_size": 200
+    },
+    "storage": {
+        "backend": "json",
+        "sqlite_file": "data/study.db"
+    },
+    "instrumentation": {
+        "mode": "off",
+        "trace_file": "logs/trace.jsonl",
+        "profile": False,
+        "profile_file": "logs/session.prof"
+    },
+    "input": {
+        "backend": "auto",
+        "script": ""
+    },
+    "persistence": {
+        "write_behind": True,
+        "interval": 2.0
+    }
+}
+
+
+@dataclass(frozen=True)
+class DisplayConfig:
+    show_translations: bool
+    show_sentences: bool
+    show_phonetics: bool
+    show_phrases: bool
+    show_memory_method: bool
+    show_synonyms: bool
+    show_tips: bool
+
+
+@dataclass(frozen=True)
+class ModeConfig:
+    default: str
+    long_sentence_mode: bool
+
+
+@dataclass(frozen=True)
+class MemorizationConfig:
+    algorithm: str
+    intervals: Tuple[int, ...]
+    mastery_threshold: float
+
+
+@dataclass(frozen=True)
+class WordDatabaseConfig:
+    local_file: str
+    remote_api: str
+    source: str
+    books: Tuple[str, ...]
+    page_size: int
+    concurrency: int
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    size: int
+    prefetch: int
+    background_prefetch: bool
+    card_size: int
+
+
+@dataclass(frozen=True)
+class StorageConfig:
+    backend: str
+    sqlite_file: str
+
+
+@dataclass(frozen=True)
+class InstrumentationConfig:
+    mode: str
+    trace_file: str
+    profile: bool
+    profile_file: str
+
+
+@dataclass(frozen=True)
+class InputConfig:
+    backend: str  # auto / msvcrt / termios / scripted
+    script: str  # scripted 后端的按键脚本或脚本文件路径
+
+
+@dataclass(frozen=True)
+class PersistenceConfig:
+    write_behind: bool  # JSON 存储时由后台线程合并写入
+    interval: float  # 后台写入的间隔秒数
+
+
+@dataclass(frozen=True)
+class Config:
+    """配置快照，各字段已解析为对应类型，热路径直接读取属性"""
+    display: DisplayConfig
+    mode: ModeConfig
+    memorization: MemorizationConfig
+    word_database: WordDatabaseConfig
+    cache: CacheConfig
+    storage: StorageConfig
+    instrumentation: InstrumentationConfig
+    input: InputConfig
+    persistence: PersistenceConfig
+
+    @classmethod
+    def from_dict(cls, config):
+        sections = {}
+        for section in fields(cls):
+            values = config.get(section.name) or {}
+            section_type = section.type
+            sections[section.name] = section_type(**{
+                field.name: _convert(values.get(field.name), field.type) for field in fields(section_type)
+            })
+        return cls(**sections)
+
+
+# 布尔字段接受的写法，其他值视为配置错误
+BOOL_VALUES = {True: True, False: False, 1: True, 0: False,
+               'true': True, 'false': False, '1': True, '0': False}
+
+
+def _convert(value, field_type):
+    if field_type is bool:
+        if value is None:
+            return False
+        key = value.strip().lower() if isinstance(value, str) else value
+        try:
+            return BOOL_VALUES[key]
+        except (KeyError, TypeError):
+            raise ValueError(f"无效的布尔值: {value!r}") from None
+    if field_type in (int, float, str):
+        return field_type(value) if value is not None else field_type()
+    # Tuple[...]: 列表转为元组，保证快照不可变
+    return tuple(value or ())
+
+
+def deep_merge(base, override):
+    """递归合并字典，override 中的值覆盖 base，返回新字典"""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
 
 class ConfigManager:
-    def __init__(self, config_path="config/config.json"):
+    """配置管理
+
+    snapshot 是合并默认值后的不可变配置快照；访问时按 check_interval
+    检查配置文件的修改时间，文件变化后自动重新加载。
+    """
+
+    def __init__(self, config_path="config/config.json", check_interval=1.0):
         self.config_path = config_path
+        self.check_interval = check_interval
+        self._mtime = None
+        self._checked_at = 0.0
         self.config = self.load_config()
+        self._snapshot = Config.from_dict(deep_merge(DEFAULT_CONFIG, self.config))
 
     def validate_config(self, config):
         required_fields = {
@@ -12,32 +205,73 @@ class ConfigManager:
             'mode': ['default'],
             'memorization': ['algorithm', 'intervals']
         }
-        
-        for section, fields in required_fields.items():
+
+        for section, names in required_fields.items():
             if section not in config:
                 raise ValueError(f"配置缺少{section}部分")
-            for field in fields:
+            for field in names:
                 if field not in config[section]:
                     raise ValueError(f"配置缺少{section}.{field}字段")
 
+    def _create_default_config(self):
+        self._write(DEFAULT_CONFIG)
+
     def load_config(self):
         """加载配置文件"""
         if not os.path.exists(self.config_path):
             self._create_default_config()
-        
+
+        mtime = os.stat(self.config_path).st_mtime_ns
         with open(self.config_path, 'r', encoding='utf-8') as f:
             config = json.load(f)
             self.validate_config(config)
-            return config
+        self._mtime = mtime
+        return config
+
+    @property
+    def snapshot(self) -> Config:
+        """当前配置快照，配置文件被修改后自动重新加载"""
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self.reload_if_changed()
+        return self._snapshot
+
+    def reload_if_changed(self) -> bool:
+        """配置文件的修改时间变化时重新加载，文件无效时保留原配置"""
+        try:
+            if os.stat(self.config_path).st_mtime_ns == self._mtime:
+                return False
+            config = self.load_config()
+            snapshot = Config.from_dict(deep_merge(DEFAULT_CONFIG, config))
+        except (OSError, ValueError):
+            return False  # 文件正在写入或内容无效，下次再试
+        self.config = config
+        self._snapshot = snapshot
+        return True
+
+    def _write(self, config):
+        """先写临时文件再替换，避免写入中途留下不完整的配置"""
+        os.makedirs(os.path.dirname(self.config_path) or '.', exist_ok=True)
+        tmp_path = self.config_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.config_path)
 
     def update_config(self, new_config):
-        """更新配置"""
-        self.config.update(new_config)
-        with open(self.config_path, 'w', encoding='utf-8') as f:
-            json.dump(self.config, f, ensure_ascii=False, indent=4)
-    
+        """更新配置，与现有配置逐层合并后写回文件"""
+        config = deep_merge(self.config, new_config)
+        snapshot = Config.from_dict(deep_merge(DEFAULT_CONFIG, config))
+        self._write(config)
+        self.config = config
+        self._snapshot = snapshot
+        self._mtime = os.stat(self.config_path).st_mtime_ns
+
     def get(self, key):
         """支持嵌套键的配置获取，如 'display.show_phonetics'"""
+        self.snapshot  # 触发热加载检查
         keys = key.split('.')
         value = self.config
         for k in keys:
@@ -51,6 +285,10 @@ STUDY_MODES = {
     '1': ('学习模式', 'normal_study_mode'),
     '2': ('复习模式', 'review_mode'),
     '3': ('智能模式', 'smart_mode'),  # 根据记忆算法自动安排
+    '4': ('切换词库', 'switch_book_mode'),
+    '5': ('拼写模式', 'spelling_mode'),  # 看释义输入单词
+    '6': ('释义模式', 'meaning_mode'),  # 看单词输入中文释义
+    '7': ('错词本', 'wrong_words_mode'),  # 分页浏览错词本
 }
 
 # class ModeManager:
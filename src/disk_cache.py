@@ -0,0 +1,67 @@
+import os
+import pickle
+from typing import Any, Callable, Optional
+
+# 搜索索引、BK 树等由词库派生的数据缓存在词库旁边的 pickle 文件中。
+# 文件里依次保存两个 pickle: 键 (格式版本, 词库大小, 词库修改时间) 和缓存的对象，
+# 检查缓存是否有效时只需读出键。
+
+
+def source_key(source_path: str, version: int) -> tuple:
+    """以格式版本和词库文件的大小、修改时间作为缓存键"""
+    stat = os.stat(source_path)
+    return (version, stat.st_size, stat.st_mtime_ns)
+
+
+def save(path: str, key: tuple, value: Any) -> None:
+    """写入缓存文件，先写临时文件再替换"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load(path: str, key: tuple) -> Optional[Any]:
+    """读取缓存文件，文件不存在、损坏或与词库不匹配时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            if pickle.load(f) != key:
+                return None
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+        return None
+
+
+def is_fresh(path: str, key: tuple) -> bool:
+    """只读出缓存文件中的键，判断缓存是否与词库一致"""
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f) == key
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return False
+
+
+def build_if_stale(path: str, key: tuple, build: Callable[[], Any]) -> Optional[Any]:
+    """缓存失效时重新构建并写回，返回构建的对象；缓存有效时返回 None，不读取缓存内容"""
+    if is_fresh(path, key):
+        return None
+    value = build()
+    try:
+        save(path, key, value)
+    except OSError:
+        pass
+    return value
+
+
+def load_or_build(path: str, key: tuple, build: Callable[[], Any]) -> Any:
+    """读取缓存，缓存失效时调用 build 重新构建并写回；无法写入时只在内存中使用"""
+    value = load(path, key)
+    if value is not None:
+        return value
+    value = build()
+    try:
+        save(path, key, value)
+    except OSError:
+        pass
+    return value
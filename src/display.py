@@ -1,87 +1,246 @@
 import os
+import sys
+from collections import namedtuple
 from config_manager import STUDY_MODES
-from colorama import init, Fore, Style
+from instrumentation import metrics, startup
+from card_cache import CardCache
+
+if os.name == 'nt':
+    # 只有 Windows 控制台需要 colorama 转换 ANSI 序列，其他平台不导入
+    from colorama import init
+    init()
+
+
+class Fore:
+    """前景色 ANSI 序列，与 colorama.Fore 同名"""
+    RED = "\x1b[31m"
+    GREEN = "\x1b[32m"
+    YELLOW = "\x1b[33m"
+    BLUE = "\x1b[34m"
+    CYAN = "\x1b[36m"
+
+
+class Style:
+    RESET_ALL = "\x1b[0m"
+
+
+# ANSI 控制序列，colorama 在旧版 Windows 控制台上负责转换
+CURSOR_HOME = "\x1b[H"
+CLEAR_SCREEN = CURSOR_HOME + "\x1b[2J"
+CLEAR_BELOW = "\x1b[J"  # 清除光标之后的内容
+
+RULE = f"{Fore.CYAN}═══════════════════════════════════{Style.RESET_ALL}"
+QUESTION_FOOTER = "\n".join([
+    "\n" + RULE,
+    "\nDo you know this word?",
+    f"{Fore.GREEN}Y{Style.RESET_ALL} - Yes, I know it",
+    f"{Fore.RED}N{Style.RESET_ALL} - No, show me the meaning",
+    f"{Fore.YELLOW}Q{Style.RESET_ALL} - Quit",
+])
+ANSWER_FOOTER = "\n".join([
+    "\n" + RULE,
+    "\nDid you really know it?",
+    f"{Fore.GREEN}Y{Style.RESET_ALL} - Yes, mark as known",
+    f"{Fore.RED}N{Style.RESET_ALL} - No, mark as unknown",
+])
+
+# 预渲染的卡片: 掌握度之前的部分、音标、答案，以及题面占用的行数
+RenderedCard = namedtuple('RenderedCard', 'top details answer rows')
 
-init()  # 初始化colorama
 
 class DisplayManager:
-    def __init__(self, config_manager):
+    """终端显示
+
+    每一帧先在内存中拼成完整的字符串，再一次写入终端，清屏使用 ANSI 序列。
+    同一单词从题面切换到答案时，只从题面的提示行开始重绘。
+    卡片内容按词头和显示配置缓存在 card_cache 中，只有掌握度在每次显示时填入。
+    """
+
+    def __init__(self, config_manager, out=None):
         self.config_manager = config_manager
         self.current_mode = "review"  # 默认为复习模式
+        self.out = out or sys.stdout
+        self.card_cache = CardCache(config_manager.snapshot.cache.card_size)
+        self._question_word = None  # 当前屏幕上显示题面的单词
+        self._question_rows = 0  # 题面 (含进度行) 占用的行数
 
     @staticmethod
     def show_error(message):
         """显示错误信息"""
         print(f"{Fore.RED}{message}{Style.RESET_ALL}")
-        
+
     @staticmethod
     def show_info(message):
         """显示信息"""
         print(f"{Fore.CYAN}{message}{Style.RESET_ALL}")
 
+    def _write(self, frame):
+        """一次写入整帧"""
+        self.out.write(frame)
+        self.out.flush()
+
+    @metrics.timed('render.main_menu')
     def show_main_menu(self):
         """显示主菜单"""
-        self.clear_screen()
-        print(f"\n{Fore.CYAN}═══════════════════════{Style.RESET_ALL}")
-        print(f"{Fore.GREEN}请选择学习模式:{Style.RESET_ALL}")
+        lines = [f"\n{Fore.CYAN}═══════════════════════{Style.RESET_ALL}",
+                 f"{Fore.GREEN}请选择学习模式:{Style.RESET_ALL}"]
         for key, (name, _) in STUDY_MODES.items():
-            print(f"{Fore.YELLOW}{key}{Style.RESET_ALL}. {name}")
-        print(f"{Fore.YELLOW}q{Style.RESET_ALL}. 退出程序")
-        print(f"{Fore.CYAN}═══════════════════════{Style.RESET_ALL}")
+            lines.append(f"{Fore.YELLOW}{key}{Style.RESET_ALL}. {name}")
+        lines.append(f"{Fore.YELLOW}q{Style.RESET_ALL}. 退出程序")
+        lines.append(f"{Fore.CYAN}═══════════════════════{Style.RESET_ALL}")
+        self._question_word = None
+        self._write(CLEAR_SCREEN + "\n".join(lines) + "\n")
 
+    @metrics.timed('render.clear_screen')
     def clear_screen(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self._question_word = None
+        self._write(CLEAR_SCREEN)
 
-    def display_word(self, word, memory_algorithm, show_answer=False):
-        """显示单词内容"""
-        self.clear_screen()
-        mastery = memory_algorithm.get_mastery_level(word.word)
-        beauty_mode = self.config_manager.get("display.show_tips")
-        if beauty_mode:
-            print(f"\n{Fore.CYAN}═══════════════════════════════════{Style.RESET_ALL}")
-        print(f"{Fore.GREEN}Word{Style.RESET_ALL}: {Fore.YELLOW}{word.word}{Style.RESET_ALL}")
-        if beauty_mode:
-            print(f"{Fore.BLUE}Mastery: {mastery}%{Style.RESET_ALL}")
-        
-        if self.config_manager.get("display.show_phonetics"):
-            if word.phonetics or word.uk_phonetics:
-                if word.phonetics:
-                    print(f"{Fore.GREEN}US{Style.RESET_ALL}: [{word.phonetics}]")
-                if word.uk_phonetics:
-                    print(f"{Fore.GREEN}UK{Style.RESET_ALL}: [{word.uk_phonetics}]")
+    def _display_settings(self):
+        """当前的显示配置快照，不可变，可直接作为缓存键"""
+        return self.config_manager.snapshot.display
+
+    @staticmethod
+    def _render_card(word, settings):
+        """渲染单词卡片中与掌握度无关的部分"""
+        top = []
+        if settings.show_tips:
+            top.append("\n" + RULE)
+        top.append(f"{Fore.GREEN}Word{Style.RESET_ALL}: {Fore.YELLOW}{word.word}{Style.RESET_ALL}")
+
+        details = []
+        if settings.show_phonetics:
+            if word.phonetics:
+                details.append(f"{Fore.GREEN}US{Style.RESET_ALL}: [{word.phonetics}]")
+            if word.uk_phonetics:
+                details.append(f"{Fore.GREEN}UK{Style.RESET_ALL}: [{word.uk_phonetics}]")
+
+        answer = []
+        if word.translation:
+            answer.append(f"\n{Fore.GREEN}Translations:{Style.RESET_ALL}")
+            for trans in word.get_translations():
+                answer.append(f" • {trans}")
+
+        if settings.show_sentences and word.examples:
+            answer.append(f"\n{Fore.GREEN}Examples:{Style.RESET_ALL}")
+            for example in word.get_example_sentences()[:2]:
+                answer.append(f" • {example['en']}")
+                answer.append(f"   {Fore.BLUE}{example['cn']}{Style.RESET_ALL}")
+
+        if settings.show_phrases and word.phrases:
+            answer.append(f"\n{Fore.GREEN}Phrases:{Style.RESET_ALL}")
+            for phrase in word.get_phrases():
+                answer.append(f" • {phrase['phrase']}")
+                answer.append(f"   {Fore.BLUE}{phrase['meaning']}{Style.RESET_ALL}")
+
+        if settings.show_memory_method and word.memory_method:
+            answer.append(f"\n{Fore.GREEN}Memory Tip:{Style.RESET_ALL}")
+            answer.append(f" • {word.memory_method}")
+
+        # 题面行数 (含掌握度一行)，显示答案时从下一行开始重绘
+        rows = sum(line.count("\n") + 1 for line in top + details) + (1 if settings.show_tips else 0)
+        return RenderedCard("\n".join(top), "\n".join(details), "\n".join(answer), rows)
+
+    def _card(self, word, settings):
+        return self.card_cache.get(word.word, settings,
+                                   lambda: self._render_card(word, settings))
+
+    def prerender(self, word):
+        """提前渲染卡片，供 WordCache 预取时调用"""
+        settings = self._display_settings()
+        self.card_cache.warm(word.word, settings,
+                             lambda: self._render_card(word, settings))
 
+    @metrics.timed('render.display_word')
+    def display_word(self, word, memory_algorithm, show_answer=False, header=None):
+        """显示单词内容，header (如进度) 显示在卡片上方，与卡片在同一帧写入
+
+        先显示题面再显示答案时，保留屏幕上的题面，光标移到提示行处向下重绘。
+        """
+        settings = self._display_settings()
+        card = self._card(word, settings)
+        beauty_mode = settings.show_tips
+        parts = []
+        if show_answer and self._question_word is word:
+            # 题面从第 1 行开始，第 rows + 1 行是原来的提示行
+            prefix = f"\x1b[{self._question_rows + 1};1H{CLEAR_BELOW}"
+        else:
+            prefix = CLEAR_SCREEN
+            self._question_rows = card.rows
+            if header:
+                parts.append(f"{Fore.CYAN}{header}{Style.RESET_ALL}")
+                self._question_rows += header.count("\n") + 1
+            parts.append(card.top)
+            if beauty_mode:
+                mastery = memory_algorithm.get_mastery_level(word.word)
+                parts.append(f"{Fore.BLUE}Mastery: {mastery}%{Style.RESET_ALL}")
+            parts.append(card.details)
         if show_answer:
-            if word.translation:
-                print(f"\n{Fore.GREEN}Translations:{Style.RESET_ALL}")
-                for trans in word.get_translations():
-                    print(f" • {trans}")
-            
-            if self.config_manager.get("display.show_sentences") and word.examples:
-                print(f"\n{Fore.GREEN}Examples:{Style.RESET_ALL}")
-                for example in word.get_example_sentences()[:2]:
-                    print(f" • {example['en']}")
-                    print(f"   {Fore.BLUE}{example['cn']}{Style.RESET_ALL}")
-            
-            if self.config_manager.get("display.show_phrases") and word.phrases:
-                print(f"\n{Fore.GREEN}Phrases:{Style.RESET_ALL}")
-                for phrase in word.get_phrases():
-                    print(f" • {phrase['phrase']}")
-                    print(f"   {Fore.BLUE}{phrase['meaning']}{Style.RESET_ALL}")
-            
-            if self.config_manager.get("display.show_memory_method") and word.memory_method:
-                print(f"\n{Fore.GREEN}Memory Tip:{Style.RESET_ALL}")
-                print(f" • {word.memory_method}")
+            parts.append(card.answer)
         if beauty_mode:
-            print(f"\n{Fore.CYAN}═══════════════════════════════════{Style.RESET_ALL}")
-            if not show_answer:
-                print("\nDo you know this word?")
-                print(f"{Fore.GREEN}Y{Style.RESET_ALL} - Yes, I know it")
-                print(f"{Fore.RED}N{Style.RESET_ALL} - No, show me the meaning")
-                print(f"{Fore.YELLOW}Q{Style.RESET_ALL} - Quit")
-            else:
-                print("\nDid you really know it?")
-                print(f"{Fore.GREEN}Y{Style.RESET_ALL} - Yes, mark as known")
-                print(f"{Fore.RED}N{Style.RESET_ALL} - No, mark as unknown")
+            parts.append(ANSWER_FOOTER if show_answer else QUESTION_FOOTER)
+        self._question_word = None if show_answer else word
+        self._write(prefix + "\n".join(part for part in parts if part) + "\n")
+        startup.first_card()
+
+    def show_search_results(self, query, hits, elapsed_ms):
+        """显示搜索结果，命中例句或短语时显示原文"""
+        labels = {'word': '词头', 'trans': '释义', 'sentence': '例句', 'phrase': '短语'}
+        lines = [f"\n{Fore.CYAN}搜索 \"{query}\": {len(hits)} 个结果 ({elapsed_ms:.2f} ms){Style.RESET_ALL}"]
+        for hit in hits:
+            line = f"{Fore.YELLOW}{hit.headword}{Style.RESET_ALL}"
+            if hit.field != 'word':
+                line += f"  {Fore.GREEN}[{labels[hit.field]}]{Style.RESET_ALL} {hit.text}"
+            lines.append(line)
+        self._question_word = None
+        self._write("\n".join(lines) + "\n")
+
+    def show_wrong_words(self, words, page, pages, total):
+        """显示错词本的一页: 词头和释义"""
+        lines = [f"{Fore.CYAN}错词本 第 {page + 1}/{pages} 页 (共 {total} 个){Style.RESET_ALL}"]
+        for word in words:
+            lines.append(f"{Fore.YELLOW}{word.word}{Style.RESET_ALL}  {'; '.join(word.get_translations())}")
+        if not words:
+            lines.append("错词本是空的")
+        lines.append("\n" + RULE)
+        lines.append(f"{Fore.YELLOW}n{Style.RESET_ALL} 下一页  {Fore.YELLOW}p{Style.RESET_ALL} 上一页  "
+                     f"{Fore.YELLOW}q{Style.RESET_ALL} 返回")
+        self._question_word = None
+        self._write(CLEAR_SCREEN + "\n".join(lines) + "\n")
+
+    @metrics.timed('render.typing_question')
+    def display_typing_question(self, word, direction, word_index, total_words):
+        """显示输入模式的题目: 拼写模式显示释义和首字母，释义模式显示单词和音标"""
+        card = self._card(word, self._display_settings())
+        parts = [f"{Fore.CYAN}进度: [{word_index + 1}/{total_words}]{Style.RESET_ALL}"]
+        if direction == 'spelling':
+            parts.append(f"\n{Fore.GREEN}Translations:{Style.RESET_ALL}")
+            parts.extend(f" • {trans}" for trans in word.get_translations())
+            hint = word.word[:1] + " _" * (len(word.word) - 1)
+            parts.append(f"\n{Fore.GREEN}Hint{Style.RESET_ALL}: {hint} ({len(word.word)})")
+        else:
+            parts.append(card.top)
+            parts.append(card.details)
+        parts.append("\n" + RULE)
+        parts.append(f"输入答案后回车，直接回车跳过，{Fore.YELLOW}q{Style.RESET_ALL} 退出")
+        self._question_word = None
+        self._write(CLEAR_SCREEN + "\n".join(part for part in parts if part) + "\n")
+        startup.first_card()
+
+    def display_typing_result(self, word, answer, correct, expected, distance, suggestions):
+        """显示输入模式的判定结果、完整释义和拼写建议"""
+        card = self._card(word, self._display_settings())
+        if correct and distance == 0:
+            lines = [f"\n{Fore.GREEN}✓ Correct!{Style.RESET_ALL}"]
+        elif correct:
+            lines = [f"\n{Fore.GREEN}✓ Correct{Style.RESET_ALL} (有 {distance} 处拼写错误，正确答案: {expected})"]
+        else:
+            lines = [f"\n{Fore.RED}✗ Incorrect!{Style.RESET_ALL} 你的答案: {answer}"]
+        lines.append(f"{Fore.GREEN}Word{Style.RESET_ALL}: {Fore.YELLOW}{word.word}{Style.RESET_ALL}")
+        lines.append(card.answer)
+        if suggestions:
+            lines.append(f"\n{Fore.YELLOW}你是不是要找{Style.RESET_ALL}: {', '.join(suggestions)}")
+        self._write("\n".join(line for line in lines if line) + "\n")
 
     def display_result(self, correct):
         """显示答题结果"""
@@ -90,13 +249,15 @@ class DisplayManager:
         else:
             print(f"\n{Fore.RED}✗ Incorrect!{Style.RESET_ALL}")
 
-    def show_help():
+    def show_help(self):
         """显示帮助信息"""
+        self._question_word = None
         print(f"\n{Fore.CYAN}══════ 快捷键说明 ══════{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}y{Style.RESET_ALL} - 认识这个单词")
         print(f"{Fore.YELLOW}n{Style.RESET_ALL} - 不认识")
         print(f"{Fore.YELLOW}s{Style.RESET_ALL} - 跳过当前单词")
+        print(f"{Fore.YELLOW}/{Style.RESET_ALL} - 搜索单词")
         print(f"{Fore.YELLOW}h{Style.RESET_ALL} - 显示帮助")
         print(f"{Fore.YELLOW}q{Style.RESET_ALL} - 退出当前模式")
         print(f"{Fore.CYAN}═══════════════════════{Style.RESET_ALL}")
-        input("\n按任意键继续...")
\ No newline at end of file
+        print("\n按任意键继续...")
@@ -1,7 +1,155 @@
-import msvcrt
+import atexit
+import os
+import select
+import sys
+from instrumentation import metrics
+
+
+class MsvcrtBackend:
+    """Windows 控制台按键，getch 阻塞等待，不占用 CPU"""
 
-class InputManager:
     def __init__(self):
+        import msvcrt
+        self._msvcrt = msvcrt
+
+    def read_key(self):
+        while True:
+            key = self._msvcrt.getch()
+            if key in (b'\x00', b'\xe0'):
+                self._msvcrt.getch()  # 方向键等功能键由两个字节组成，忽略
+                continue
+            return key
+
+    def read_line(self, prompt):
+        return input(prompt)
+
+
+class TermiosBackend:
+    """POSIX 终端按键
+
+    第一次读取按键时切换到 cbreak 模式 (不回显、无需回车，Ctrl-C 仍然有效)，
+    之后整个会话保持该模式，退出时由 restore 恢复终端设置；读取整行时临时
+    切回原来的行模式。用 select 阻塞等待输入。按键和整行都直接从文件描述符按字节
+    读取，标准输入是管道时也不会被缓冲区多读。
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self.fd = self.stream.fileno()
+        self.is_tty = os.isatty(self.fd)
+        self._saved = None  # 进入 cbreak 之前的终端设置
+
+    def _enter_cbreak(self):
+        if self._saved is not None:
+            return
+        import termios
+        import tty
+        self._saved = termios.tcgetattr(self.fd)
+        # 按 Ctrl-C 或异常退出时 main 的清理可能来不及执行，退出前兜底恢复
+        atexit.register(self.restore)
+        tty.setcbreak(self.fd)
+
+    def restore(self):
+        """恢复进入 cbreak 之前的终端设置，可重复调用"""
+        if self._saved is None:
+            return
+        import termios
+        saved, self._saved = self._saved, None
+        try:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, saved)
+        except termios.error:
+            pass
+
+    def read_key(self):
+        if not self.is_tty:
+            key = os.read(self.fd, 1)
+            if not key:
+                raise EOFError("输入已结束")
+            return key
+        self._enter_cbreak()
+        select.select([self.fd], [], [])
+        return os.read(self.fd, 1)
+
+    def read_line(self, prompt):
+        if self._saved is None:
+            return self._read_line(prompt)
+        import termios
+        import tty
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self._saved)
+        try:
+            return self._read_line(prompt)
+        finally:
+            if self._saved is not None:
+                tty.setcbreak(self.fd)
+
+    def _read_line(self, prompt):
+        """与 read_key 从同一个文件描述符按字节读到换行
+
+        不用 input(): sys.stdin 的缓冲区会一次读走管道中后续的按键。
+        """
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        line = bytearray()
+        while True:
+            char = os.read(self.fd, 1)
+            if not char:
+                if not line:
+                    raise EOFError("输入已结束")
+                break
+            if char == b'\n':
+                break
+            line += char
+        return line.decode('utf-8', errors='replace').rstrip('\r')
+
+
+class ScriptedBackend:
+    """按预先给定的文本模拟输入，用于无人值守运行
+
+    read_key 逐个字符读取 (跳过换行)，read_line 读取到行尾。
+    脚本用完后抛出 EOFError。
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.pos = 0
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read())
+
+    def read_key(self):
+        while self.pos < len(self.script):
+            char = self.script[self.pos]
+            self.pos += 1
+            if char not in '\r\n':
+                return char.encode('utf-8')
+        raise EOFError("输入脚本已结束")
+
+    def read_line(self, prompt):
+        if self.pos >= len(self.script):
+            raise EOFError("输入脚本已结束")
+        end = self.script.find('\n', self.pos)
+        end = len(self.script) if end == -1 else end
+        line, self.pos = self.script[self.pos:end], end + 1
+        print(f"{prompt}{line}")
+        return line
+
+
+def create_backend(name="auto", script=""):
+    """按名称创建输入后端，auto 在 Windows 上使用 msvcrt，其他平台使用 termios"""
+    if name == "scripted":
+        return ScriptedBackend.from_file(script) if os.path.exists(script) else ScriptedBackend(script)
+    if name == "msvcrt" or (name == "auto" and os.name == 'nt'):
+        return MsvcrtBackend()
+    if name in ("termios", "auto"):
+        return TermiosBackend()
+    raise ValueError(f"未知的输入后端: {name}")
+
+
+class InputManager:
+    def __init__(self, backend=None):
+        self.backend = backend or create_backend()
         self.commands = {
             b'y': 'yes',     # Y键 - 知道这个词
             b'n': 'no',      # N键 - 不知道
@@ -9,46 +157,56 @@ class InputManager:
             b'h': 'help',    # H键 - 显示帮助
             b's': 'skip',    # S键 - 跳过
             b' ': 'next',    # 空格键 - 下一个
+            b'/': 'search',  # / 键 - 搜索单词
         }
 
+    def cleanup(self):
+        """恢复终端设置"""
+        restore = getattr(self.backend, 'restore', None)
+        if restore is not None:
+            restore()
+
+    @metrics.timed('input.wait')
     def get_input(self):
         """获取用户输入（无需按回车）"""
         while True:
-            if msvcrt.kbhit():
-                key = msvcrt.getch().lower()
-                if key in self.commands:
-                    return self.commands[key]
+            key = self.backend.read_key().lower()
+            if key in self.commands:
+                return self.commands[key]
 
+    @metrics.timed('input.wait')
     def get_confirm(self):
         """获取确认输入"""
         while True:
-            if msvcrt.kbhit():
-                key = msvcrt.getch().lower()
-                if key in [b'y', b'n']:
-                    return self.commands[key] == 'yes'
+            key = self.backend.read_key().lower()
+            if key in [b'y', b'n']:
+                return self.commands[key] == 'yes'
 
-    def get_answer(self):
+    def get_answer(self, prompt="\nYour translation: "):
         """获取用户输入的答案"""
-        return input("\nYour translation: ").strip()
+        return self.backend.read_line(prompt).strip()
 
+    def get_query(self):
+        """获取搜索关键词"""
+        return self.backend.read_line("\n搜索 (词头前缀/中文释义/例句单词): ").strip()
+
+    @metrics.timed('input.wait')
     def wait_key(self):
         """等待用户按任意键"""
-        while True:
-            if msvcrt.kbhit():
-                return msvcrt.getch()
+        return self.backend.read_key()
 
+    @metrics.timed('input.wait')
     def get_menu_choice(self, valid_choices):
         """获取菜单选择
-        
+
         Args:
             valid_choices: 有效的选择列表,如 ['1','2','3','q']
-            
+
         Returns:
             str: 用户选择的选项
         """
         while True:
-            if msvcrt.kbhit():
-                key = msvcrt.getch().lower()
-                choice = key.decode('utf-8')
-                if choice in valid_choices:
-                    return choice
+            key = self.backend.read_key().lower()
+            choice = key.decode('utf-8', errors='ignore')
+            if choice in valid_choices:
+                return choice
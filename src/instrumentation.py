@@ -0,0 +1,232 @@
+import bisect
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# 延迟直方图的桶上界 (毫秒)，最后一个桶收集更慢的调用
+BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Histogram:
+    """固定分桶的延迟直方图"""
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+
+    def percentile(self, q: float) -> float:
+        """按桶上界估计分位数 (毫秒)"""
+        target = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(BUCKETS_MS[i], self.max) if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'total_ms': self.total,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'min_ms': self.min if self.count else 0.0,
+            'max_ms': self.max,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'buckets': {(f"<={BUCKETS_MS[i]}" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}"): count
+                        for i, count in enumerate(self.counts) if count},
+        }
+
+
+class Instrumentation:
+    """计时与计数
+
+    mode:
+        off     - 不记录，计时钩子只做一次判断
+        summary - 在内存中累计计数和延迟直方图，退出时打印汇总
+        trace   - 在 summary 的基础上，每次计时向 trace_file 追加一行 JSON
+    profile 为 True 时在整个会话期间运行 cProfile，结束时写入 profile_file。
+    """
+
+    MODES = ('off', 'summary', 'trace')
+
+    def __init__(self):
+        self.mode = 'off'
+        self.enabled = False
+        self.trace_file = "logs/trace.jsonl"
+        self.profile_file = "logs/session.prof"
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self._trace = None
+        self._profiler: Optional[cProfile.Profile] = None
+        self._lock = threading.Lock()
+
+    def configure(self, mode: str = 'off', trace_file: Optional[str] = None, profile: bool = False,
+                  profile_file: Optional[str] = None) -> None:
+        if mode not in self.MODES:
+            raise ValueError(f"未知的 instrumentation.mode: {mode}")
+        self.close()
+        self.mode = mode
+        self.enabled = mode != 'off'
+        self.trace_file = trace_file or self.trace_file
+        self.profile_file = profile_file or self.profile_file
+        if mode == 'trace':
+            os.makedirs(os.path.dirname(self.trace_file) or '.', exist_ok=True)
+            self._trace = open(self.trace_file, 'a', encoding='utf-8')
+        if profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, seconds: float, **fields) -> None:
+        """记录一次耗时"""
+        if not self.enabled:
+            return
+        ms = seconds * 1000
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(ms)
+            if self._trace is not None:
+                record = {'ts': time.time(), 'name': name, 'ms': round(ms, 3),
+                          'thread': threading.current_thread().name, **fields}
+                self._trace.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    @contextmanager
+    def timer(self, name: str, **fields):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **fields)
+
+    def timed(self, name: str):
+        """方法装饰器，关闭时直接调用原函数"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'timers': {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+            }
+
+    def print_summary(self) -> None:
+        """打印各计时点的调用次数和延迟"""
+        if not self.enabled:
+            return
+        summary = self.summary()
+        print("\n性能统计:")
+        print(f"{'计时点':<28} {'次数':>7} {'平均ms':>9} {'p50ms':>8} {'p95ms':>8} {'最大ms':>9}")
+        for name, timer in summary['timers'].items():
+            print(f"{name:<28} {timer['count']:>7} {timer['mean_ms']:>9.2f} {timer['p50_ms']:>8.1f} "
+                  f"{timer['p95_ms']:>8.1f} {timer['max_ms']:>9.2f}")
+        for name, value in sorted(summary['counters'].items()):
+            print(f"{name:<28} {value:>7}")
+        if self._trace is not None:
+            print(f"逐次记录: {self.trace_file}")
+
+    def close(self) -> None:
+        """停止 cProfile 并关闭 trace 文件"""
+        if self._profiler is not None:
+            self._profiler.disable()
+            os.makedirs(os.path.dirname(self.profile_file) or '.', exist_ok=True)
+            self._profiler.dump_stats(self.profile_file)
+            print(f"cProfile 结果已写入 {self.profile_file} (python -m pstats {self.profile_file})")
+            self._profiler = None
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
+
+
+class StartupProfile:
+    """启动耗时，从导入 main 到显示第一张卡片
+
+    mark 记录各阶段结束的时刻，等待用户输入的时间不计入。
+    未调用 start 时各方法什么也不做。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started = 0.0
+        self.waited = 0.0
+        self.marks = []  # (阶段, 距启动的秒数)
+        self.details: Dict[str, float] = {}  # 附加的分项耗时 (毫秒)，例如词库加载的各阶段
+        self.finished = False
+
+    def start(self, started: Optional[float] = None) -> None:
+        self.enabled = True
+        self.started = started if started is not None else time.perf_counter()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started - self.waited
+
+    def mark(self, name: str) -> None:
+        """记录阶段结束，同名阶段只记录第一次"""
+        if self.enabled and not self.finished and all(name != seen for seen, _ in self.marks):
+            self.marks.append((name, self.elapsed()))
+
+    def add_wait(self, seconds: float) -> None:
+        if self.enabled and not self.finished:
+            self.waited += seconds
+
+    def first_card(self) -> None:
+        """第一张卡片已显示，之后不再记录"""
+        if self.enabled and not self.finished:
+            self.mark('first_card')
+            self.finished = True
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        print("\n启动耗时 (不含等待输入):")
+        print(f"{'阶段':<28} {'本阶段ms':>10} {'累计ms':>10}")
+        previous = 0.0
+        for name, at in self.marks:
+            print(f"{name:<28} {(at - previous) * 1000:>10.1f} {at * 1000:>10.1f}")
+            previous = at
+        for name, ms in self.details.items():
+            print(f"  {name:<26} {ms:>10.1f}")
+        if not self.finished:
+            print("(未显示卡片)")
+
+
+metrics = Instrumentation()
+startup = StartupProfile()
@@ -0,0 +1,87 @@
+import codecs
+import json
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+class JSONArrayStream:
+    """增量解析 JSON 数组，数据分块到达时逐个产出已完整的元素"""
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._started = False
+        self.done = False
+
+    def feed(self, text: str) -> List:
+        """追加一段文本，返回本次新解析出的元素"""
+        self._buffer += text
+        items = []
+        buffer, pos, end = self._buffer, 0, len(self._buffer)
+        while not self.done:
+            while pos < end and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= end:
+                break
+            if not self._started:
+                if buffer[pos] != '[':
+                    raise ValueError("词库数据不是 JSON 数组")
+                self._started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                self.done = True
+                pos += 1
+                break
+            try:
+                item, pos = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # 元素尚未接收完整
+            items.append(item)
+        self._buffer = buffer[pos:]
+        return items
+
+    def finish(self) -> None:
+        """全部文本送入后调用，数组没有结束或结束后还有其他内容时抛出 ValueError"""
+        if not self.done or self._buffer.strip():
+            raise ValueError("词库数据不完整")
+
+
+def check_entry(word_data) -> Dict:
+    """校验词条包含 headWord 和 content，返回词条本身"""
+    if not isinstance(word_data, dict) or "headWord" not in word_data or "content" not in word_data:
+        name = word_data.get('headWord', 'unknown') if isinstance(word_data, dict) else 'unknown'
+        raise ValueError(f"无效的单词数据格式: {name}")
+    return word_data
+
+
+def iter_book(filepath: str, chunk_size: int = 1 << 20,
+              on_chunk: Optional[Callable[[bytes], None]] = None) -> Iterator[Dict]:
+    """分块读取 JSON 词库，逐个产出校验过的词条，不必等整个文件解析完
+
+    文件按字节块读取到结尾，on_chunk 依次收到每一块 (编译词库时边读边计算摘要)。
+    """
+    stream = JSONArrayStream()
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    count = 0
+    try:
+        with open(filepath, 'rb') as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if chunk and on_chunk is not None:
+                    on_chunk(chunk)
+                for word_data in stream.feed(decoder.decode(chunk, final=not chunk)):
+                    count += 1
+                    yield check_entry(word_data)
+                if not chunk:
+                    break
+    except FileNotFoundError:
+        raise FileNotFoundError(f"找不到词库文件: {filepath}")
+    except UnicodeDecodeError:
+        raise ValueError(f"词库文件 {filepath} 格式错误")
+    try:
+        stream.finish()
+    except ValueError:
+        raise ValueError(f"词库文件 {filepath} 格式错误")
+    # 检查数据是否成功加载
+    if not count:
+        raise ValueError("词库数据为空")
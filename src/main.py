@@ -1,98 +1,267 @@
+import time
+STARTED = time.perf_counter()  # --profile-startup 从这里开始计时，需在导入其他模块之前
+
 from config_manager import ConfigManager, STUDY_MODES
 from word_manager import DataManager
 from display import DisplayManager
-from input_manager import InputManager
+from input_manager import InputManager, create_backend
 from memorization import MemoryAlgorithm
+from persister import WriteBehindPersister
+from bk_tree import closest, max_typos
+from instrumentation import metrics, startup
+from utils import get_logger
+from contextlib import nullcontext
+import argparse
+import asyncio
 import sys
+import threading
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="背单词")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="退出时打印从启动到显示第一张卡片的各阶段耗时")
+    return parser.parse_args(argv)
 
-def main():
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile_startup:
+        startup.start(STARTED)
+        startup.mark('imports')
     managers = {}
     try:
         # 初始化各个管理器
         init_managers(managers)
         # 运行主循环
-        run_main_loop(managers)
+        asyncio.run(run_main_loop(managers))
+    except EOFError:
+        DisplayManager.show_info("输入已结束，退出程序")
     except Exception as e:
         DisplayManager.show_error(f"程序错误: {str(e)}")
     finally:
         cleanup_resources(managers)
+        startup.report()
 
 def init_managers(managers):
     """初始化所有管理器"""
     managers['config'] = ConfigManager()
-    managers['data'] = DataManager(source_type="local")
+    config = managers['config'].snapshot
+    metrics.configure(mode=config.instrumentation.mode,
+                      trace_file=config.instrumentation.trace_file,
+                      profile=config.instrumentation.profile,
+                      profile_file=config.instrumentation.profile_file)
+    startup.mark('config')
+    store = None
+    if config.storage.backend == "sqlite":
+        store = init_store(config)
+    persister = None
+    if store is None and config.persistence.write_behind:
+        persister = managers['persister'] = WriteBehindPersister(config.persistence.interval)
+    source_type = config.word_database.source
+    managers['memory'] = MemoryAlgorithm(store=store, persister=persister)
+    managers['data'] = DataManager(source_type=source_type, store=store, memory=managers['memory'],
+                                   persister=persister,
+                                   cache_size=config.cache.size,
+                                   prefetch_count=config.cache.prefetch,
+                                   background_prefetch=config.cache.background_prefetch,
+                                   api_options={
+                                       'page_size': config.word_database.page_size,
+                                       'concurrency': config.word_database.concurrency,
+                                   })
     managers['display'] = DisplayManager(managers['config'])
-    managers['input'] = InputManager()
-    managers['memory'] = MemoryAlgorithm()
+    # 后台预取单词时顺便预渲染卡片
+    managers['data'].word_cache.warm = managers['display'].prerender
+    managers['input'] = InputManager(create_backend(config.input.backend, config.input.script))
+    if store is not None:
+        managers['store'] = store
+    startup.mark('managers')
     
     # 加载词库
     try:
-        managers['data'].load_data("data/KaoYanluan_1.json")
+        books = list(config.word_database.books)
+        if source_type == "local" and books:
+            managers['data'].load_books(books)
+        elif source_type == "local":
+            managers['data'].load_data("data/KaoYanluan_1.json")
+        else:
+            managers['data'].load_data(config.word_database.remote_api)
     except Exception as e:
         DisplayManager.show_error(f"加载词库失败: {str(e)}")
         sys.exit(1)
+    startup.mark('load_books')
+    for name, ms in managers['data'].load_stages.items():
+        startup.details[f'load.{name}'] = ms
+
+def init_store(config):
+    """打开 SQLite 存储，首次使用时导入已有的 JSON 进度"""
+    from storage import StudyStore  # 只有 sqlite 存储需要 sqlite3
+    store = StudyStore(config.storage.sqlite_file)
+    if store.is_empty():
+        store.import_json("data/progress.json", "data/memory_stats.json")
+    return store
 
 def cleanup_resources(managers):
     """清理资源"""
+    # 先写完后台待写的修改，再关闭日志文件
+    persister = managers.pop('persister', None)
+    if persister is not None:
+        try:
+            persister.close()
+        except Exception as e:
+            print(f"保存进度时出错: {str(e)}")
     for manager in managers.values():
         if hasattr(manager, 'cleanup'):
             try:
                 manager.cleanup()
             except Exception as e:
                 print(f"清理资源时出错: {str(e)}")
+    metrics.close()
+
+async def read_input(managers, method, *args):
+    """在独立的守护线程中等待按键，事件循环可以继续执行其他任务
+
+    不使用线程池: 等待输入的线程可能一直阻塞，不能让退出时的线程池关闭卡住。
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(setter, value):
+        if not future.done():
+            setter(value)
+
+    def worker():
+        try:
+            result = getattr(managers['input'], method)(*args)
+        except BaseException as e:
+            callback = (deliver, future.set_exception, e)
+        else:
+            callback = (deliver, future.set_result, result)
+        try:
+            loop.call_soon_threadsafe(*callback)
+        except RuntimeError:
+            pass  # 事件循环已关闭
+
+    threading.Thread(target=worker, name="input-wait", daemon=True).start()
+    started = time.perf_counter()
+    try:
+        return await future
+    finally:
+        startup.add_wait(time.perf_counter() - started)
+
+class AnswerRecorder:
+    """在后台线程中按顺序记录答题结果，下一张卡片不必等待写入完成"""
+
+    def __init__(self, managers):
+        self.managers = managers
+        self._last = None
 
-def run_main_loop(managers):
+    def record(self, word, correct):
+        previous = self._last
+
+        async def run():
+            if previous is not None:
+                await previous
+            # 写入失败只记录日志，不影响之后的答题和 drain
+            try:
+                await asyncio.to_thread(record_answer, self.managers, word, correct)
+            except Exception as e:
+                get_logger().error(f"记录单词 {word.word} 的答题结果失败: {e}")
+        self._last = asyncio.ensure_future(run())
+
+    async def drain(self):
+        """等待已提交的答题全部写入"""
+        if self._last is not None:
+            last, self._last = self._last, None
+            await last
+
+_background_tasks = set()
+
+def prefetch_card(managers, word):
+    """在后台线程中解码并预渲染即将显示的单词"""
+    if word is None:
+        return
+    task = asyncio.ensure_future(asyncio.to_thread(managers['display'].prerender, word))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def run_main_loop(managers):
     """主循环"""
+    managers['recorder'] = AnswerRecorder(managers)
     while True:
         managers['display'].show_main_menu()
-        choice = managers['input'].get_menu_choice(list(STUDY_MODES.keys()) + ['q'])
+        startup.mark('main_menu')
+        choice = await read_input(managers, 'get_menu_choice', list(STUDY_MODES.keys()) + ['q'])
         
         if choice == 'q':
-            if confirm_exit(managers):
+            if await confirm_exit(managers):
                 break
             continue
             
         mode_func = globals()[STUDY_MODES[choice][1]]
         try:
-            mode_func(managers)
+            await mode_func(managers)
+        except EOFError:
+            raise
         except Exception as e:
             DisplayManager.show_error(f"模式运行出错: {str(e)}")
+        finally:
+            await managers['recorder'].drain()
 
-def confirm_exit(managers):
+async def confirm_exit(managers):
     """确认退出"""
     print("\n是否确认退出? (y/n)")
-    if managers['input'].get_confirm():
+    if await read_input(managers, 'get_confirm'):
         # 保存学习进度
         try:
-            managers['data'].save_progress()
+            await managers['recorder'].drain()
+            await asyncio.to_thread(managers['data'].save_progress)
+            if 'persister' in managers:
+                await asyncio.to_thread(managers['persister'].flush)
             print("学习进度已保存")
             # 显示学习统计
             print("\n学习统计:")
             stats = managers['data'].get_statistics()
             for key, value in stats.items():
                 print(f"{key}: {value}")
+            print(f"正确率分布 (每 10%): {managers['data'].get_mastery_histogram()}")
+            print(f"单词缓存: {managers['data'].word_cache.stats()}")
+            print(f"卡片缓存: {managers['display'].card_cache.stats()}")
+            metrics.print_summary()
         except Exception as e:
             print(f"保存进度时出错: {str(e)}")
         return True
     return False
 
-def process_word(word, managers, word_index, total_words):
+async def search_words(managers):
+    """输入关键词搜索当前词库，显示结果后等待按键"""
+    query = await read_input(managers, 'get_query')
+    if not query:
+        return
+    started = time.perf_counter()
+    hits = managers['data'].search(query)
+    managers['display'].show_search_results(query, hits, (time.perf_counter() - started) * 1000)
+    print("\n按任意键继续...")
+    await read_input(managers, 'wait_key')
+
+async def process_word(word, managers, word_index, total_words, next_word=None):
     """统一的单词处理逻辑"""
+    prefetch_card(managers, next_word)
     while True:
-        # 显示进度信息
-        DataManager.show_info(f"\n进度: [{word_index + 1}/{total_words}]")
-        if word.review_count > 0:        
-            DataManager.show_info(f"复习次数: {word.review_count}, 正确次数: {word.correct_count}")
-
-        # 显示单词
-        managers['display'].display_word(word, managers['memory'], show_answer=False)
+        # 进度信息与单词在同一帧显示
+        header = f"进度: [{word_index + 1}/{total_words}]"
+        if word.review_count > 0:
+            header += f"\n复习次数: {word.review_count}, 正确次数: {word.correct_count}"
+        managers['display'].display_word(word, managers['memory'], show_answer=False, header=header)
         
-        command = managers['input'].get_input()
+        command = await read_input(managers, 'get_input')
         
         if command == 'quit':
             return 'quit'
         elif command == 'help':
             managers['display'].show_help()
+            await read_input(managers, 'wait_key')
+            continue
+        elif command == 'search':
+            await search_words(managers)
             continue
         elif command == 'skip':
             return 'skip'
@@ -102,18 +271,25 @@ def process_word(word, managers, word_index, total_words):
             
             if command == 'yes':
                 print("\n你真的认识这个单词吗? (y/n)")
-                really_knew = managers['input'].get_confirm()
-                managers['data'].update_word_status(word, really_knew)
-                managers['memory'].update_memory(word.word, really_knew)
+                really_knew = await read_input(managers, 'get_confirm')
+                managers['recorder'].record(word, really_knew)
             else:
-                managers['data'].update_word_status(word, False)
-                managers['memory'].update_memory(word.word, False)
+                managers['recorder'].record(word, False)
                 print("\n按任意键继续...")
-                managers['input'].wait_key()
+                await read_input(managers, 'wait_key')
                 
             return 'next'
 
-def normal_study_mode(managers):
+@metrics.timed('data.record_answer')
+def record_answer(managers, word, correct):
+    """记录答题结果，使用 SQLite 存储时进度与复习计划在同一事务中写入"""
+    store = managers.get('store')
+    with store.transaction() if store is not None else nullcontext():
+        managers['data'].update_word_status(word, correct)
+        managers['memory'].update_memory(word.word, correct)
+    managers['data'].sync_memory(word.word)
+
+async def normal_study_mode(managers):
     """顺序学习模式"""
     word_index = 0
     total_words = len(managers['data'].words)
@@ -121,7 +297,7 @@ def normal_study_mode(managers):
     while word_index < total_words:
         try:
             word = managers['data'].get_word(word_index)
-            result = process_word(word, managers, word_index, total_words)
+            result = await process_word(word, managers, word_index, total_words)
             
             if result == 'quit':
                 break
@@ -130,97 +306,205 @@ def normal_study_mode(managers):
             elif result == 'next':
                 word_index += 1
                 
+        except EOFError:
+            raise
         except Exception as e:
             DisplayManager.show_error(f"处理单词时出错: {str(e)}")
             break
 
-def review_mode(managers):
-    word_index = 0
+async def review_mode(managers):
+    """复习模式 - 每轮从薄弱单词中抽样一次，答完这一轮再按最新进度重新抽样"""
     while True:
         try:
-            revied_words = managers['data'].get_review_words()
-            words_count = len(revied_words)
-            if word_index >= words_count:
+            await managers['recorder'].drain()
+            review_words = managers['data'].get_review_words()
+            if not review_words:
                 print("没有需要复习的单词了")
                 print(managers['data'].get_statistics())
                 break
-            word_index %= words_count
-            word = managers['data'].get_review_words()[word_index]
-            
-            # 首先显示单词（不显示答案）
-            managers['display'].display_word(word, managers['memory'], show_answer=False)
-            
-            # 获取用户输入
-            command = managers['input'].get_input()
-            
-            if command == 'quit':
-                break
-            elif command in ['yes', 'no']:
-                # 无论用户选择yes还是no，都先显示答案
-                managers['display'].display_word(word, managers['memory'], show_answer=True)
-                
-                # 如果用户选择yes，需要二次确认
-                if command == 'yes':
-                    really_knew = managers['input'].get_confirm()
-                    managers['data'].update_word_status(word, really_knew)
-                    managers['memory'].update_memory(word.word, really_knew)
-                else:  # command == 'no'
-                    managers['data'].update_word_status(word, False)
-                    managers['memory'].update_memory(word.word, False)
-                
-                    # 等待用户查看答案
-                    print("\n按任意键继续...")
-                    managers['input'].wait_key()
-                
-                word_index += 1
-                
+            for i, word in enumerate(review_words):
+                if i + 1 < len(review_words):
+                    prefetch_card(managers, review_words[i + 1])
+                if await review_word(managers, word) == 'quit':
+                    return
+
+        except EOFError:
+            raise
         except Exception as e:
             print(f"程序运行出错: {str(e)}")
             break
 
-def smart_mode(managers):
+async def review_word(managers, word):
+    """复习一个单词，直到用户作答或退出"""
+    while True:
+        # 首先显示单词（不显示答案）
+        managers['display'].display_word(word, managers['memory'], show_answer=False)
+
+        # 获取用户输入
+        command = await read_input(managers, 'get_input')
+
+        if command == 'quit':
+            return 'quit'
+        elif command == 'search':
+            await search_words(managers)
+        elif command in ['yes', 'no']:
+            # 无论用户选择yes还是no，都先显示答案
+            managers['display'].display_word(word, managers['memory'], show_answer=True)
+
+            # 如果用户选择yes，需要二次确认
+            if command == 'yes':
+                really_knew = await read_input(managers, 'get_confirm')
+                managers['recorder'].record(word, really_knew)
+            else:  # command == 'no'
+                managers['recorder'].record(word, False)
+
+                # 等待用户查看答案
+                print("\n按任意键继续...")
+                await read_input(managers, 'wait_key')
+            return 'next'
+
+async def smart_mode(managers):
     """智能学习模式 - 根据记忆算法调整复习"""
     while True:
         try:
+            # 上一轮的答题写入后再重新选词
+            await managers['recorder'].drain()
             # 获取推荐学习的单词
             words = get_recommended_words(managers)
             if not words:
                 print("当前没有需要学习的单词")
+                next_due = managers['memory'].peek_next_due()
+                if next_due:
+                    print(f"下一个单词将在 {next_due.strftime('%Y-%m-%d %H:%M')} 到期")
                 break
                 
             for i, word in enumerate(words):
-                result = process_word(word, managers, i, len(words))
+                next_word = words[i + 1] if i + 1 < len(words) else None
+                result = await process_word(word, managers, i, len(words), next_word)
                 if result == 'quit':
                     return
                     
+        except EOFError:
+            raise
         except Exception as e:
             DisplayManager.show_error(f"智能模式运行出错: {str(e)}")
             break
 
-def get_recommended_words(managers, limit=10):
+async def switch_book_mode(managers):
+    """切换当前词库"""
+    data = managers['data']
+    names = list(data.books)
+    if len(names) < 2:
+        print(f"当前只加载了一本词库: {data.current_book}")
+        print("\n按任意键继续...")
+        await read_input(managers, 'wait_key')
+        return
+    print("\n请选择词库:")
+    for i, name in enumerate(names, 1):
+        marker = " (当前)" if name == data.current_book else ""
+        print(f"{i}. {name}{marker}")
+    choice = await read_input(managers, 'get_menu_choice',
+                              [str(i) for i in range(1, min(len(names), 9) + 1)])
+    await managers['recorder'].drain()
+    data.switch_book(names[int(choice) - 1])
+    print(f"已切换到 {data.current_book}")
+
+WRONG_WORDS_PAGE_SIZE = 20
+
+async def wrong_words_mode(managers):
+    """分页浏览错词本，按加入顺序显示"""
+    data = managers['data']
+    await managers['recorder'].drain()
+    page = 0
+    while True:
+        total = len(data.wrong_words)
+        pages = max(1, -(-total // WRONG_WORDS_PAGE_SIZE))
+        page = min(page, pages - 1)
+        words = data.get_wrong_words(page, WRONG_WORDS_PAGE_SIZE)
+        managers['display'].show_wrong_words(words, page, pages, total)
+        choice = await read_input(managers, 'get_menu_choice', ['n', 'p', 'q'])
+        if choice == 'q':
+            return
+        page = page + 1 if choice == 'n' else max(page - 1, 0)
+
+async def spelling_mode(managers):
+    """拼写模式 - 看中文释义输入单词"""
+    await typing_mode(managers, 'spelling')
+
+async def meaning_mode(managers):
+    """释义模式 - 看单词输入中文释义"""
+    await typing_mode(managers, 'meaning')
+
+def grade_answer(word, answer, direction):
+    """按编辑距离判定输入的答案
+
+    拼写模式与词头比较，释义模式与拆分后的各个义项比较，取最接近的一个；
+    距离不超过 max_typos 即算正确。返回 (是否正确, 最接近的答案, 距离)。
+    """
+    targets = [word.word] if direction == 'spelling' else word.get_meanings()
+    expected, distance = closest(answer, targets)
+    return expected is not None and distance <= max_typos(expected), expected, distance
+
+async def typing_mode(managers, direction):
+    """输入答案的学习模式，选词方式与智能模式相同"""
+    data = managers['data']
+    prompt = "\nYour answer: " if direction == 'spelling' else "\nYour translation: "
+    if direction == 'spelling':
+        # 提前构建 BK 树，答错时的拼写建议不必等待
+        await asyncio.to_thread(data.spelling_tree)
+    # 释义模式只选有中文释义的单词，否则这些单词永远无法作答
+    accept = None if direction == 'spelling' else (lambda word: bool(word.get_meanings()))
+    while True:
+        await managers['recorder'].drain()
+        words = get_recommended_words(managers, accept=accept)
+        if not words:
+            print("当前没有需要学习的单词" if accept is None else "当前没有带中文释义、需要学习的单词")
+            break
+        for i, word in enumerate(words):
+            if i + 1 < len(words):
+                prefetch_card(managers, words[i + 1])
+            managers['display'].display_typing_question(word, direction, i, len(words))
+            answer = await read_input(managers, 'get_answer', prompt)
+            if answer.lower() == 'q':
+                return
+            if not answer:
+                continue
+
+            correct, expected, distance = grade_answer(word, answer, direction)
+            managers['recorder'].record(word, correct)
+            suggestions = []
+            if not correct and direction == 'spelling':
+                suggestions = [name for name in data.suggest_words(answer)
+                               if name not in (word.word.lower(), answer.lower())]
+            managers['display'].display_typing_result(word, answer, correct, expected, distance, suggestions)
+            print("\n按任意键继续...")
+            await read_input(managers, 'wait_key')
+
+@metrics.timed('select.recommended_words')
+def get_recommended_words(managers, limit=10, accept=None):
     """获取推荐学习的单词
     
     基于以下规则:
     1. 从未学习过的单词
     2. 正确率低于80%的单词
     3. 需要复习的单词
+
+    accept 可以进一步筛选单词，返回 False 的单词不会被选中。
     """
     words = []
     memory = managers['memory']
-    
-    # 获取所有单词
-    all_words = managers['data'].words
+    data = managers['data']
     
     # 1. 获取从未学习的单词
-    new_words = [w for w in all_words if w.review_count == 0]
-    if new_words:
-        words.extend(new_words[:limit//2])
+    words.extend(data.get_new_words(limit // 2, accept=accept))
         
-    # 2. 获取需要复习的单词
-    review_words = [w for w in all_words 
-                   if w.review_count > 0 and memory.should_review(w.word)]
-    if review_words:
-        words.extend(review_words[:(limit - len(words))])
+    # 2. 获取需要复习的单词 (从到期堆中按到期时间取出)
+    def is_review_word(name):
+        word = data.find_word(name)
+        return (word is not None and word.review_count > 0
+                and (accept is None or accept(word)))
+    due_names = memory.get_due_words(limit=limit - len(words), accept=is_review_word)
+    words.extend(data.find_word(name) for name in due_names)
         
     return words
 
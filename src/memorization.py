@@ -1,29 +1,97 @@
+import heapq
 import json
 import os
+import threading
+from contextlib import closing
 from datetime import datetime, timedelta
 
+from instrumentation import metrics
+
+DEFAULT_INTERVALS = [1, 3, 7, 15, 30]  # 各级别的基础间隔天数
+DEFAULT_INTERVAL_OFFSET = 0.5  # 间隔按 (offset + 正确率) 缩放
+
+
+def schedule_review(level, correct_count, total_count, correct,
+                    intervals=DEFAULT_INTERVALS, offset=DEFAULT_INTERVAL_OFFSET):
+    """复习调度规则: 根据一次答题结果计算新的级别、计数和下次复习间隔
+
+    返回 (level, correct_count, total_count, days)。
+    MemoryAlgorithm 和 simulator 共用这一规则。
+    """
+    total_count += 1
+    if correct:
+        correct_count += 1
+        # 根据正确率动态调整级别
+        if correct_count / total_count >= 0.8 and level < len(intervals) - 1:
+            level += 1
+    else:
+        # 错误时降级更多，增加复习频率
+        level = max(0, level - 2)
+
+    # 动态调整复习间隔
+    accuracy = correct_count / total_count
+    days = max(1, int(intervals[level] * (offset + accuracy)))
+    return level, correct_count, total_count, days
+
+
 class MemoryAlgorithm:
-    def __init__(self):
-        self.intervals = [1, 3, 7, 15, 30]  # 间隔天数
+    def __init__(self, store=None, persister=None):
+        self.intervals = list(DEFAULT_INTERVALS)  # 间隔天数
+        self.interval_offset = DEFAULT_INTERVAL_OFFSET
         self.word_stats = {}  # 记录每个单词的学习状态
         self.stats_file = "data/memory_stats.json"
+        self.store = store  # 可选的 StudyStore，设置后复习计划写入 SQLite
+        self._due_heap = []  # (next_review, word) 最小堆，过期条目在弹出时丢弃
+        self._lock = threading.Lock()  # 后台写入时保护 word_stats 和到期堆
+        self.persister = persister  # 可选的 WriteBehindPersister，设置后由后台线程写入 stats_file
+        if persister is not None and store is None:
+            persister.register('memory', self.save_stats, batch_size=20)
         self.load_stats()
 
+    @metrics.timed('memory.load_stats')
     def load_stats(self):
-        if os.path.exists(self.stats_file):
+        if self.store is not None:
+            self.word_stats = self.store.load_schedules()
+        elif os.path.exists(self.stats_file):
             with open(self.stats_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 for word, stats in data.items():
                     stats['next_review'] = datetime.fromisoformat(stats['next_review'])
                 self.word_stats = data
+        self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        """按当前 word_stats 重建到期堆"""
+        self._due_heap = [(stats['next_review'], word) for word, stats in self.word_stats.items()]
+        heapq.heapify(self._due_heap)
+
+    def _push_due(self, word):
+        heapq.heappush(self._due_heap, (self.word_stats[word]['next_review'], word))
+        # 过期条目过多时整体重建，避免堆无限增长
+        if len(self._due_heap) > 2 * len(self.word_stats) + 64:
+            self._rebuild_heap()
 
+    def _is_current(self, entry):
+        stats = self.word_stats.get(entry[1])
+        return stats is not None and stats['next_review'] == entry[0]
+
+    @metrics.timed('memory.save_stats')
     def save_stats(self):
-        os.makedirs(os.path.dirname(self.stats_file), exist_ok=True)
-        with open(self.stats_file, 'w', encoding='utf-8') as f:
+        if self.store is not None:
+            self.store.save_all_schedules(self.word_stats)
+            return
+        with self._lock:
             data = {word: {**stats, 
                    'next_review': stats['next_review'].isoformat()} 
                    for word, stats in self.word_stats.items()}
+        # 先写临时文件并落盘，再替换，写入中途崩溃不会损坏原文件
+        os.makedirs(os.path.dirname(self.stats_file), exist_ok=True)
+        tmp_file = self.stats_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.stats_file)
 
     def init_word(self, word):
         """初始化单词学习状态"""
@@ -34,30 +102,26 @@ class MemoryAlgorithm:
                 'correct_count': 0,  # 正确次数
                 'total_count': 0,  # 总次数
             }
+            self._push_due(word)
 
+    @metrics.timed('memory.update')
     def update_memory(self, word, correct):
         """更新单词记忆状态"""
-        self.init_word(word)
-        stats = self.word_stats[word]
-        stats['total_count'] += 1
-
-        if correct:
-            stats['correct_count'] += 1
-            # 根据正确率动态调整级别
-            accuracy = stats['correct_count'] / stats['total_count']
-            if accuracy >= 0.8 and stats['level'] < len(self.intervals) - 1:
-                stats['level'] += 1
-        else:
-            # 错误时降级更多，增加复习频率
-            stats['level'] = max(0, stats['level'] - 2)
+        with self._lock:
+            self.init_word(word)
+            stats = self.word_stats[word]
+            stats['level'], stats['correct_count'], stats['total_count'], days = schedule_review(
+                stats['level'], stats['correct_count'], stats['total_count'], correct,
+                self.intervals, self.interval_offset)
 
-        # 动态调整复习间隔
-        base_days = self.intervals[stats['level']]
-        accuracy = stats['correct_count'] / stats['total_count']
-        adjusted_days = int(base_days * (0.5 + accuracy))
-        
-        stats['next_review'] = datetime.now() + timedelta(days=max(1, adjusted_days))
-        self.save_stats()
+            stats['next_review'] = datetime.now() + timedelta(days=days)
+            self._push_due(word)
+        if self.store is not None:
+            self.store.save_schedule(word, stats)
+        elif self.persister is not None:
+            self.persister.mark_dirty('memory')
+        else:
+            self.save_stats()
 
     def should_review(self, word):
         """检查单词是否需要复习"""
@@ -65,6 +129,50 @@ class MemoryAlgorithm:
             return True
         return datetime.now() >= self.word_stats[word]['next_review']
 
+    @metrics.timed('select.due_words')
+    def get_due_words(self, now=None, limit=None, accept=None):
+        """按到期时间升序返回已到期的单词
+
+        从到期堆中依次弹出，只检查最早到期的条目，取完后再放回；使用 SQLite 存储时
+        改为按索引查询。accept 可用于过滤单词 (如只要当前词库中的单词)。
+        """
+        now = now or datetime.now()
+        if self.store is not None:
+            # 使用 SQLite 存储时直接按 next_review 索引查询，复习计划与进度在同一数据库中
+            due = []
+            with closing(self.store.iter_due_words(now)) as words:
+                for word in words:
+                    if limit is not None and len(due) >= limit:
+                        break
+                    if accept is None or accept(word):
+                        due.append(word)
+            return due
+        # 答题写入线程会同时向堆中追加条目，弹出和放回期间持有锁
+        with self._lock:
+            heap = self._due_heap
+            popped, due = [], []
+            while heap and (limit is None or len(due) < limit):
+                entry = heap[0]
+                if not self._is_current(entry):
+                    heapq.heappop(heap)
+                    continue
+                if entry[0] > now:
+                    break
+                popped.append(heapq.heappop(heap))
+                if accept is None or accept(entry[1]):
+                    due.append(entry[1])
+            for entry in popped:
+                heapq.heappush(heap, entry)
+        return due
+
+    def peek_next_due(self):
+        """返回最早的下次复习时间，没有记录时返回 None"""
+        with self._lock:
+            heap = self._due_heap
+            while heap and not self._is_current(heap[0]):
+                heapq.heappop(heap)
+            return heap[0][0] if heap else None
+
     def get_mastery_level(self, word):
         """获取掌握程度 (0-100)"""
         if word not in self.word_stats:
@@ -0,0 +1,97 @@
+import threading
+from typing import Callable, Dict
+
+from instrumentation import metrics
+
+
+class _Entry:
+    __slots__ = ('save', 'batch_size', 'pending', 'saves', 'errors', 'last_error', 'lock')
+
+    def __init__(self, save: Callable[[], None], batch_size: int):
+        self.save = save
+        self.batch_size = batch_size
+        self.pending = 0  # 上次写入之后的修改次数
+        self.saves = 0
+        self.errors = 0
+        self.last_error = None
+        self.lock = threading.Lock()  # 同一项不会同时写入两次
+
+
+class WriteBehindPersister:
+    """后台写入线程
+
+    各模块用 register 登记一个写入函数，修改内存状态后调用 mark_dirty。
+    多次修改合并为一次写入: 修改次数达到 batch_size 时立即唤醒写入线程，
+    否则每隔 interval 秒写入一次。flush / close 在调用线程中同步写入全部待写项。
+    """
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self._entries: Dict[str, _Entry] = {}
+        self._cond = threading.Condition()
+        self._closing = False
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+
+    def register(self, name: str, save: Callable[[], None], batch_size: int = 1) -> None:
+        with self._cond:
+            self._entries[name] = _Entry(save, batch_size)
+
+    def mark_dirty(self, name: str) -> None:
+        with self._cond:
+            entry = self._entries[name]
+            entry.pending += 1
+            if entry.pending >= entry.batch_size:
+                self._cond.notify()
+
+    def _ready(self) -> bool:
+        return any(entry.pending >= entry.batch_size for entry in self._entries.values())
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closing or self._ready(), timeout=self.interval)
+                if self._closing:
+                    return
+            self._write_dirty()
+
+    def _write_dirty(self) -> None:
+        for name, entry in list(self._entries.items()):
+            with entry.lock:
+                with self._cond:
+                    pending, entry.pending = entry.pending, 0
+                if not pending:
+                    continue
+                try:
+                    with metrics.timer(f'persist.{name}', changes=pending):
+                        entry.save()
+                    entry.saves += 1
+                except Exception as e:
+                    # 写入失败时保留脏标记，下次重试
+                    with self._cond:
+                        entry.pending += pending
+                    entry.errors += 1
+                    entry.last_error = str(e)
+
+    def flush(self) -> None:
+        """立即写入全部待写项"""
+        self._write_dirty()
+        failed = {name: entry.last_error for name, entry in self._entries.items() if entry.pending}
+        if failed:
+            raise IOError(f"写入失败: {failed}")
+
+    def close(self) -> None:
+        """停止写入线程并写入剩余修改"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._worker.join()
+        self.flush()
+
+    def cleanup(self) -> None:
+        self.close()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {name: {'pending': entry.pending, 'saves': entry.saves, 'errors': entry.errors}
+                    for name, entry in self._entries.items()}
@@ -0,0 +1,152 @@
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+# 列名、类型和空位的默认值
+COLUMNS = (
+    ('review_count', np.int32, 0),
+    ('correct_count', np.int32, 0),
+    ('last_reviewed', np.float64, np.nan),
+    ('difficulty_level', np.int8, 0),
+    ('level', np.int8, -1),
+    ('next_review', np.float64, np.nan),
+)
+
+
+class ProgressColumns:
+    """与单词列表平行的 NumPy 进度数组
+
+    第 i 个元素对应 words[i]。DataManager 在答题时逐项更新，
+    统计、掌握度分布和到期计数都用向量化的掩码完成，不遍历 Word 对象。
+    未复习时间和没有复习计划的单词记为 NaN，没有复习计划的 level 记为 -1。
+    分页加载时数组容量按倍数增长，review_count 等属性是前 len(self) 个元素的视图。
+    """
+
+    def __init__(self, words: List = (), word_stats: Optional[Dict] = None):
+        self.positions: Dict[str, int] = {}
+        self._position: Callable[[str], Optional[int]] = self.positions.get  # 词头 -> 序号
+        self._size = 0
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._reserve(0)
+        self.append(words, word_stats)
+
+    @classmethod
+    def for_book(cls, count: int, position: Callable[[str], Optional[int]], words: Iterable = (),
+                 word_stats: Optional[Dict] = None) -> 'ProgressColumns':
+        """按词条数直接分配数组，只写入 words 中的单词和有复习计划的单词
+
+        position 按词头返回序号，用于编译词库 (CompiledBook.find)，不必为每个词头建立字典。
+        """
+        columns = cls()
+        columns._position = position
+        columns._reserve(count)
+        columns._resize(count)
+        for word in words:
+            columns.update_word(word)
+        for word_name, stats in (word_stats or {}).items():
+            columns.update_memory(word_name, stats)
+        return columns
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, capacity: int) -> None:
+        """保证容量不小于 capacity，扩容时至少翻倍，空位填入默认值"""
+        current = len(self._buffers['review_count']) if self._buffers else -1
+        if capacity <= current:
+            return
+        capacity = max(capacity, current * 2)
+        for name, dtype, default in COLUMNS:
+            buffer = np.full(capacity, default, dtype=dtype)
+            if name in self._buffers:
+                buffer[:self._size] = self._buffers[name][:self._size]
+            self._buffers[name] = buffer
+        self._resize(self._size)
+
+    def _resize(self, size: int) -> None:
+        self._size = size
+        for name, _, _ in COLUMNS:
+            setattr(self, name, self._buffers[name][:size])
+
+    def append(self, words: List, word_stats: Optional[Dict] = None) -> None:
+        """在末尾追加一批单词"""
+        start = self._size
+        count = len(words)
+        end = start + count
+        word_stats = word_stats or {}
+        self._reserve(end)
+        buffers = self._buffers
+        buffers['review_count'][start:end] = np.fromiter(
+            (w.review_count for w in words), dtype=np.int32, count=count)
+        buffers['correct_count'][start:end] = np.fromiter(
+            (w.correct_count for w in words), dtype=np.int32, count=count)
+        buffers['last_reviewed'][start:end] = np.fromiter(
+            (w.last_reviewed.timestamp() if w.last_reviewed else np.nan for w in words),
+            dtype=np.float64, count=count)
+        buffers['difficulty_level'][start:end] = np.fromiter(
+            (w.difficulty_level for w in words), dtype=np.int8, count=count)
+        level, next_review = buffers['level'], buffers['next_review']
+        for i, word in enumerate(words, start):
+            self.positions[word.word] = i
+            stats = word_stats.get(word.word)
+            if stats is not None:
+                level[i] = stats['level']
+                next_review[i] = stats['next_review'].timestamp()
+        self._resize(end)
+
+    def update_word(self, word) -> None:
+        """同步单个单词的学习进度"""
+        i = self._position(word.word)
+        if i is None:
+            return
+        self.review_count[i] = word.review_count
+        self.correct_count[i] = word.correct_count
+        self.last_reviewed[i] = word.last_reviewed.timestamp() if word.last_reviewed else np.nan
+        self.difficulty_level[i] = word.difficulty_level
+
+    def update_memory(self, word_name: str, stats: Dict) -> None:
+        """同步单个单词的复习计划"""
+        i = self._position(word_name)
+        if i is None:
+            return
+        self.level[i] = stats['level']
+        self.next_review[i] = stats['next_review'].timestamp()
+
+    def accuracy(self) -> np.ndarray:
+        """正确率，未复习的单词为 NaN"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.review_count > 0, self.correct_count / self.review_count, np.nan)
+
+    def accuracy_mask(self, low: float = 0.0, high: float = 1.0) -> np.ndarray:
+        """已复习且正确率在 [low, high) 内的单词"""
+        accuracy = self.accuracy()
+        with np.errstate(invalid='ignore'):
+            return (accuracy >= low) & ((accuracy < high) | (high >= 1.0))
+
+    def due_mask(self, now: Optional[datetime] = None) -> np.ndarray:
+        """已复习且复习计划已到期的单词"""
+        now = (now or datetime.now()).timestamp()
+        with np.errstate(invalid='ignore'):
+            return (self.review_count > 0) & (self.next_review <= now)
+
+    def new_indices(self, limit: Optional[int] = None) -> np.ndarray:
+        """从未复习的单词序号 (按词库顺序)"""
+        return np.flatnonzero(self.review_count == 0)[:limit]
+
+    def statistics(self, mastery_threshold: float = 0.8) -> Dict:
+        reviewed = self.review_count > 0
+        return {
+            'total_words': len(self),
+            'reviewed_words': int(reviewed.sum()),
+            'mastered_words': int(self.accuracy_mask(mastery_threshold).sum()),
+            'due_words': int(self.due_mask().sum()),
+        }
+
+    def mastery_histogram(self, bins: int = 10) -> List[int]:
+        """已复习单词的正确率分布，bins 个等宽区间"""
+        accuracy = self.accuracy()
+        accuracy = accuracy[~np.isnan(accuracy)]
+        counts, _ = np.histogram(accuracy, bins=bins, range=(0.0, 1.0))
+        return counts.tolist()
@@ -0,0 +1,95 @@
+import json
+import os
+from typing import Dict, Iterable, Iterator
+
+
+class ProgressJournal:
+    """学习进度追加日志
+
+    每次答题只追加一行 JSON 记录，定期由 DataManager 写入完整快照后重写，
+    加载进度时在快照之上按序号重放剩余记录。
+    """
+
+    def __init__(self, journal_file: str = "data/progress.journal", compact_every: int = 200,
+                 fsync: bool = True):
+        self.journal_file = journal_file
+        self.compact_every = compact_every
+        self.fsync = fsync  # False 时 append 只写入系统缓冲区，由调用方定期 sync
+        self.last_seq = 0  # 最后写入的记录序号
+        self.pending = 0  # 快照之后追加的记录数
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.journal_file) or '.', exist_ok=True)
+            self._file = open(self.journal_file, 'a', encoding='utf-8')
+        return self._file
+
+    def append(self, record: Dict) -> int:
+        """追加一条记录并落盘，返回记录序号"""
+        self.last_seq += 1
+        record = {'seq': self.last_seq, **record}
+        f = self._open()
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+        self.pending += 1
+        return self.last_seq
+
+    def sync(self) -> None:
+        """把已追加的记录落盘"""
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+
+    def replay(self, after_seq: int = 0) -> Iterator[Dict]:
+        """按顺序读取序号大于 after_seq 的记录
+
+        崩溃时可能留下不完整的最后一行，直接忽略。
+        """
+        self.last_seq = max(self.last_seq, after_seq)
+        for record in self.records():
+            seq = record.get('seq', 0)
+            self.last_seq = max(self.last_seq, seq)
+            if seq > after_seq:
+                self.pending += 1
+                yield record
+
+    def records(self) -> Iterator[Dict]:
+        """读取日志中的全部记录，不改变计数"""
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    break
+
+    def should_compact(self) -> bool:
+        return self.pending >= self.compact_every
+
+    def rewrite(self, records: Iterable[Dict]) -> None:
+        """快照写入完成后用保留的记录替换日志，记录按顺序重新编号
+
+        先写临时文件并落盘再替换，替换前崩溃时旧日志仍然完整。
+        """
+        self.close()
+        os.makedirs(os.path.dirname(self.journal_file) or '.', exist_ok=True)
+        tmp_file = self.journal_file + '.tmp'
+        pending = 0
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for record in records:
+                self.last_seq += 1
+                record = {'seq': self.last_seq, **{k: v for k, v in record.items() if k != 'seq'}}
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                pending += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.journal_file)
+        self.pending = pending
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
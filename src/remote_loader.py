@@ -0,0 +1,104 @@
+import codecs
+import hashlib
+import json
+import os
+from typing import Dict, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from json_stream import JSONArrayStream, iter_book
+
+
+class RemoteBookLoader:
+    """远程词库加载器
+
+    复用连接池会话，边下载边解析，并把响应体缓存到本地；
+    再次加载时用 ETag / Last-Modified 做条件请求，未变化则直接读取缓存。
+    """
+
+    def __init__(self, cache_dir: str = "data/cache", timeout=(5, 30), pool_size: int = 4,
+                 chunk_size: int = 64 * 1024, session: requests.Session = None):
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.session = session or self._create_session(pool_size)
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _cache_paths(self, url: str):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.meta.json'
+
+    def _read_meta(self, meta_path: str) -> Dict:
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _iter_cached(self, body_path: str) -> Iterator[Dict]:
+        # 缓存同样分块解析，第一个词条不必等整个文件读完
+        return iter_book(body_path)
+
+    def iter_entries(self, url: str) -> Iterator[Dict]:
+        """按顺序产出远程词库中的词条"""
+        body_path, meta_path = self._cache_paths(url)
+        has_cache = os.path.exists(body_path)
+        meta = self._read_meta(meta_path) if has_cache else {}
+
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+        except requests.RequestException:
+            if has_cache:
+                # 网络不可用时退回到本地缓存
+                yield from self._iter_cached(body_path)
+                return
+            raise
+
+        with response:
+            if response.status_code == 304 and has_cache:
+                yield from self._iter_cached(body_path)
+                return
+            if response.status_code != 200:
+                raise Exception(f"远程数据加载失败: HTTP {response.status_code}")
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = body_path + '.tmp'
+            stream = JSONArrayStream()
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            try:
+                with open(tmp_path, 'wb') as cache_file:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        cache_file.write(chunk)
+                        yield from stream.feed(decoder.decode(chunk))
+                    yield from stream.feed(decoder.decode(b'', final=True))
+                if not stream.done:
+                    raise ValueError("远程词库数据不完整")
+                os.replace(tmp_path, body_path)
+            finally:
+                # 下载出错或调用方中途停止读取时，删除不完整的缓存文件
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'url': url,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                }, f, ensure_ascii=False)
+
+    def close(self) -> None:
+        self.session.close()
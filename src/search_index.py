@@ -0,0 +1,174 @@
+import os
+import re
+from bisect import bisect_left
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import disk_cache
+
+# 缓存文件格式变化时递增，旧缓存自动重建
+INDEX_VERSION = 2
+
+TOKEN_RE = re.compile(r"[a-z][a-z'-]*")
+CJK_RE = re.compile(r"[㐀-鿿]")
+
+# 搜索结果: 词头、命中的字段 (word / trans / sentence / phrase) 和对应文本
+SearchHit = namedtuple('SearchHit', 'headword field text')
+
+
+def index_path(book_path: str) -> str:
+    """词库对应的索引缓存文件路径"""
+    return os.path.splitext(book_path)[0] + '.idx'
+
+
+def _intersect(postings: List[List[int]]) -> Iterator[int]:
+    """按顺序逐个产生多个有序倒排表的交集
+
+    遍历最短的表，在其余表中二分查找，调用方取够结果即可停止。
+    """
+    postings = sorted(postings, key=len)
+    shortest, others = postings[0], postings[1:]
+    for doc in shortest:
+        for other in others:
+            position = bisect_left(other, doc)
+            if position == len(other) or other[position] != doc:
+                break
+        else:
+            yield doc
+
+
+class SearchIndex:
+    """单本词库的搜索索引
+
+    - 词头前缀树: 小写词头逐字符展开，'' 键保存以该节点结尾的单词序号
+    - 中文释义倒排索引: tranCn 中每个汉字 -> 释义文档列表，查询时取交集再做子串校验
+    - 英文词元倒排索引: 例句 sContent 和短语 pContent 的单词 -> 文档列表
+
+    文档是 (单词序号, 字段, 文本)，倒排表保存文档序号。
+    """
+
+    def __init__(self):
+        self.headwords: List[str] = []
+        self.trie: Dict = {}
+        self.docs: List[tuple] = []
+        self.cn_index: Dict[str, List[int]] = {}
+        self.token_index: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.headwords)
+
+    @classmethod
+    def build(cls, entries: Iterable[Dict]) -> 'SearchIndex':
+        """从原始词条构建索引"""
+        index = cls()
+        for entry in entries:
+            index.add(entry)
+        return index
+
+    def add(self, entry: Dict) -> None:
+        word_id = len(self.headwords)
+        headword = entry.get("headWord", "")
+        self.headwords.append(headword)
+
+        node = self.trie
+        for char in headword.lower():
+            node = node.setdefault(char, {})
+        node.setdefault('', []).append(word_id)
+
+        content = entry.get("content", {}).get("word", {}).get("content", {})
+        for trans in content.get("trans", []):
+            text = trans.get("tranCn")
+            if text:
+                self._add_doc(self.cn_index, set(CJK_RE.findall(text)), word_id, 'trans', text)
+        for sentence in content.get("sentence", {}).get("sentences", []):
+            text = sentence.get("sContent")
+            if text:
+                self._add_doc(self.token_index, set(TOKEN_RE.findall(text.lower())), word_id, 'sentence', text)
+        for phrase in content.get("phrase", {}).get("phrases", []):
+            text = phrase.get("pContent")
+            if text:
+                self._add_doc(self.token_index, set(TOKEN_RE.findall(text.lower())), word_id, 'phrase', text)
+
+    def _add_doc(self, inverted: Dict[str, List[int]], keys, word_id: int, field: str, text: str) -> None:
+        doc_id = len(self.docs)
+        self.docs.append((word_id, field, text))
+        for key in keys:
+            inverted.setdefault(key, []).append(doc_id)
+
+    def prefix(self, prefix: str, limit: int = 20) -> List[str]:
+        """按字母顺序返回以 prefix 开头的词头，完全匹配的排在最前"""
+        node = self.trie
+        for char in prefix.lower():
+            node = node.get(char)
+            if node is None:
+                return []
+        results: List[str] = []
+        stack = [node]
+        while stack and len(results) < limit:
+            node = stack.pop()
+            results.extend(self.headwords[word_id] for word_id in node.get('', ()))
+            # 逆序入栈，出栈时按字母顺序
+            stack.extend(node[char] for char in sorted(node, reverse=True) if char)
+        return results[:limit]
+
+    def _lookup(self, inverted: Dict[str, List[int]], keys) -> Iterator[int]:
+        postings = []
+        for key in keys:
+            posting = inverted.get(key)
+            if posting is None:
+                return iter(())
+            postings.append(posting)
+        return _intersect(postings) if postings else iter(())
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """搜索词头、中文释义、例句和短语
+
+        含汉字的查询在释义中查找子串；其他查询先按词头前缀匹配，
+        再查找同时包含所有查询单词的例句和短语。每个单词只返回一次。
+        """
+        query = query.strip()
+        if not query:
+            return []
+        hits: List[SearchHit] = []
+        seen = set()
+
+        def add(word_id: int, field: str, text: str) -> bool:
+            headword = self.headwords[word_id]
+            if headword not in seen:
+                seen.add(headword)
+                hits.append(SearchHit(headword, field, text))
+            return len(hits) >= limit
+
+        if CJK_RE.search(query):
+            for doc_id in self._lookup(self.cn_index, set(CJK_RE.findall(query))):
+                word_id, field, text = self.docs[doc_id]
+                if query in text and add(word_id, field, text):
+                    break
+            return hits
+
+        for headword in self.prefix(query, limit):
+            seen.add(headword)
+            hits.append(SearchHit(headword, 'word', headword))
+        tokens = set(TOKEN_RE.findall(query.lower()))
+        if len(hits) < limit and tokens:
+            for doc_id in self._lookup(self.token_index, tokens):
+                word_id, field, text = self.docs[doc_id]
+                if add(word_id, field, text):
+                    break
+        return hits
+
+
+def load_or_build(source_path: str, entries: Callable[[], Iterable[Dict]],
+                  cache_path: Optional[str] = None) -> SearchIndex:
+    """读取词库的索引缓存，缓存失效时重新构建并写回"""
+    return disk_cache.load_or_build(cache_path or index_path(source_path),
+                                    disk_cache.source_key(source_path, INDEX_VERSION),
+                                    lambda: SearchIndex.build(entries()))
+
+
+def build_if_stale(source_path: str, entries: Callable[[], Iterable[Dict]],
+                   cache_path: Optional[str] = None) -> Optional[SearchIndex]:
+    """索引缓存失效时重新构建并写回，返回新索引；缓存有效时返回 None，留到第一次搜索再读取"""
+    return disk_cache.build_if_stale(cache_path or index_path(source_path),
+                                     disk_cache.source_key(source_path, INDEX_VERSION),
+                                     lambda: SearchIndex.build(entries()))
@@ -0,0 +1,281 @@
+"""离线间隔重复模拟器
+
+用与 MemoryAlgorithm 相同的调度规则 (memorization.schedule_review)，
+模拟大量学习者按天学习新词和复习，或重放 progress.journal 中记录的答题，
+报告每天的复习量、记忆保持率估计和到期积压。
+
+用法:
+    python src/simulator.py --learners 200 --words 5000 --days 365
+    python src/simulator.py --intervals 1 2 5 12 30 --offset 0.3
+    python src/simulator.py --journal data/progress.journal
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from memorization import DEFAULT_INTERVAL_OFFSET, DEFAULT_INTERVALS, schedule_review
+from progress_journal import ProgressJournal
+
+DEFAULT_PARAMS = {
+    'words': 5000,  # 每个学习者的词库大小
+    'days': 365,
+    'new_per_day': 20,
+    'max_reviews': None,  # 每天最多复习数，None 表示不限
+    'intervals': DEFAULT_INTERVALS,
+    'offset': DEFAULT_INTERVAL_OFFSET,
+    'first_recall': 0.6,  # 第一次见到新词时答对的概率
+    'stability': 5.0,  # 0 级单词的记忆稳定性 (天)
+    'stability_growth': 2.0,  # 每升一级稳定性的倍数
+    'skill_spread': 0.3,  # 学习者之间稳定性差异 (对数正态分布的 sigma)
+}
+
+DAILY_KEYS = ('new', 'reviews', 'correct', 'due', 'backlog', 'retention')
+
+
+def schedule_arrays(level, correct_count, total_count, correct, intervals, offset):
+    """schedule_review 的向量化版本，逐元素结果与其完全一致"""
+    intervals = np.asarray(intervals, dtype=np.float64)
+    total_count = total_count + 1
+    correct_count = correct_count + correct
+    accuracy = correct_count / total_count
+    promote = correct & (accuracy >= 0.8) & (level < len(intervals) - 1)
+    level = np.where(correct, level + promote, np.maximum(0, level - 2))
+    days = np.maximum(1, (intervals[level] * (offset + accuracy)).astype(np.int64))
+    return level, correct_count, total_count, days
+
+
+def check_rules(intervals, offset, samples: int = 2000, seed: int = 0) -> None:
+    """用随机状态比对向量化规则和 schedule_review，不一致时抛出 AssertionError"""
+    rng = np.random.default_rng(seed)
+    total = rng.integers(0, 50, samples)
+    correct_count = (rng.random(samples) * (total + 1)).astype(np.int64).clip(0, total)
+    level = rng.integers(0, len(intervals), samples)
+    correct = rng.random(samples) < 0.7
+    vector = schedule_arrays(level, correct_count, total, correct, intervals, offset)
+    for i in range(samples):
+        expected = schedule_review(int(level[i]), int(correct_count[i]), int(total[i]),
+                                   bool(correct[i]), intervals, offset)
+        actual = tuple(int(column[i]) for column in vector)
+        assert actual == expected, f"调度规则不一致: {expected} != {actual}"
+
+
+def _simulate_chunk(params: Dict, learners: int, seed) -> Dict[str, np.ndarray]:
+    """模拟一组学习者，返回按天累加的指标"""
+    rng = np.random.default_rng(seed)
+    words, days = params['words'], params['days']
+    intervals = np.asarray(params['intervals'], dtype=np.float64)
+    growth = params['stability_growth'] ** np.arange(len(intervals))
+    skill = rng.lognormal(0.0, params['skill_spread'], size=(learners, 1))
+
+    level = np.zeros((learners, words), dtype=np.int64)
+    correct_count = np.zeros((learners, words), dtype=np.int64)
+    total_count = np.zeros((learners, words), dtype=np.int64)
+    next_due = np.full((learners, words), np.iinfo(np.int64).max, dtype=np.int64)
+    last_review = np.zeros((learners, words), dtype=np.int64)
+    daily = {key: np.zeros(days, dtype=np.float64) for key in DAILY_KEYS}
+    max_reviews = params['max_reviews']
+
+    introduced = 0
+    for day in range(days):
+        start, introduced = introduced, min(words, introduced + params['new_per_day'])
+        active = slice(0, introduced)
+        lvl, cc, tc = level[:, active], correct_count[:, active], total_count[:, active]
+        nd, lr = next_due[:, active], last_review[:, active]
+
+        # 到期复习 (不含今天的新词)，超出上限时按到期时间优先
+        due = (nd <= day) & (tc > 0)
+        due_counts = due.sum(axis=1)
+        review = due
+        if max_reviews is not None and (due_counts > max_reviews).any():
+            keys = np.where(due, nd, np.iinfo(np.int64).max)
+            kth = min(max_reviews, keys.shape[1] - 1)
+            order = np.argpartition(keys, kth, axis=1)[:, :max_reviews]
+            review = np.zeros_like(due)
+            np.put_along_axis(review, order, True, axis=1)
+            review &= due
+        answered = review.copy()
+        answered[:, start:] = True  # 今天的新词
+
+        stability = params['stability'] * growth[lvl] * skill
+        recall = np.exp(-(day - lr) / stability)
+        recall[:, start:] = params['first_recall']
+        correct = rng.random(recall.shape) < recall
+
+        new_level, new_cc, new_tc, interval = schedule_arrays(
+            lvl, cc, tc, correct, intervals, params['offset'])
+        lvl[answered] = new_level[answered]
+        cc[answered] = new_cc[answered]
+        tc[answered] = new_tc[answered]
+        nd[answered] = day + interval[answered]
+        lr[answered] = day
+
+        daily['new'][day] = (introduced - start) * learners
+        daily['reviews'][day] = review.sum()
+        daily['correct'][day] = (correct & review).sum()
+        daily['due'][day] = due_counts.sum()
+        daily['backlog'][day] = (due & ~review).sum()
+        # 一天结束时已学单词的平均回忆概率
+        stability = params['stability'] * growth[lvl] * skill
+        daily['retention'][day] = np.exp(-(day + 1 - lr) / stability).sum()
+    return daily
+
+
+def simulate(learners: int = 100, workers: int = 1, seed: int = 0, **overrides) -> Dict:
+    """模拟 learners 个学习者，按 workers 个进程分组并行
+
+    返回 {'params', 'daily': {指标: 每天的值}, 'summary'}，
+    daily 中 reviews / correct / due / backlog 为每个学习者的平均值。
+    """
+    params = {**DEFAULT_PARAMS, **{k: v for k, v in overrides.items() if v is not None}}
+    check_rules(params['intervals'], params['offset'])
+
+    workers = max(1, min(workers, learners))
+    sizes = [learners // workers + (1 if i < learners % workers else 0) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    started = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, [params] * workers, sizes, seeds))
+    else:
+        chunks = [_simulate_chunk(params, sizes[0], seeds[0])]
+    elapsed = time.perf_counter() - started
+
+    daily = {key: sum(chunk[key] for chunk in chunks) for key in DAILY_KEYS}
+    learned = np.minimum(params['words'], params['new_per_day'] * np.arange(1, params['days'] + 1))
+    daily['retention'] = daily['retention'] / (learned * learners)
+    for key in ('new', 'reviews', 'correct', 'due', 'backlog'):
+        daily[key] = daily[key] / learners
+
+    total_reviews = float((daily['reviews'] + daily['new']).sum() * learners)
+    return {
+        'params': params,
+        'daily': {key: values.tolist() for key, values in daily.items()},
+        'summary': _summarize(daily, {
+            'learners': learners,
+            'total_reviews': int(total_reviews),
+            'seconds': elapsed,
+            'reviews_per_second': total_reviews / elapsed if elapsed else 0.0,
+        }),
+    }
+
+
+def _summarize(daily: Dict, extra: Dict) -> Dict:
+    reviews = np.asarray(daily['reviews'])
+    correct = np.asarray(daily['correct'])
+    return {
+        **extra,
+        'mean_daily_reviews': float(reviews.mean()) if len(reviews) else 0.0,
+        'peak_daily_reviews': float(reviews.max()) if len(reviews) else 0.0,
+        'review_accuracy': float(correct.sum() / reviews.sum()) if reviews.sum() else 0.0,
+        'final_retention': float(daily['retention'][-1]) if len(daily['retention']) else 0.0,
+        'final_backlog': float(daily['backlog'][-1]) if len(daily['backlog']) else 0.0,
+    }
+
+
+def replay(records: Iterable[Dict], intervals: Optional[List[int]] = None,
+           offset: float = DEFAULT_INTERVAL_OFFSET) -> Dict:
+    """按给定参数重放实际答题记录 (progress.journal 格式)
+
+    复习量和正确率来自记录本身；到期积压按新参数计算的复习计划统计，
+    即每天结束时已到期但当天没有复习的单词数；
+    retention 用当天复习 (非首次作答) 的实际正确率近似。
+    """
+    intervals = intervals or DEFAULT_INTERVALS
+    by_day: Dict[str, List] = {}
+    for record in records:
+        if 'word' not in record or 'time' not in record:
+            continue
+        answered_at = datetime.fromisoformat(record['time'])
+        by_day.setdefault(answered_at.date().isoformat(), []).append(
+            (answered_at, f"{record.get('book', '')}/{record['word']}", bool(record.get('correct'))))
+
+    states: Dict[str, tuple] = {}  # key -> (level, correct_count, total_count, next_review)
+    daily = {key: [] for key in DAILY_KEYS}
+    dates = sorted(by_day)
+    for date in dates:
+        answers = sorted(by_day[date])
+        end_of_day = datetime.fromisoformat(date) + timedelta(days=1)
+        new = reviews = correct_reviews = 0
+        reviewed = set()
+        for answered_at, key, correct in answers:
+            level, correct_count, total_count, _ = states.get(key, (0, 0, 0, None))
+            if total_count == 0:
+                new += 1
+            else:
+                reviews += 1
+                correct_reviews += correct
+            level, correct_count, total_count, days = schedule_review(
+                level, correct_count, total_count, correct, intervals, offset)
+            states[key] = (level, correct_count, total_count, answered_at + timedelta(days=days))
+            reviewed.add(key)
+        due = sum(1 for key, state in states.items() if state[3] < end_of_day)
+        daily['new'].append(new)
+        daily['reviews'].append(reviews)
+        daily['correct'].append(correct_reviews)
+        daily['due'].append(due)
+        daily['backlog'].append(sum(1 for key, state in states.items()
+                                    if state[3] < end_of_day and key not in reviewed))
+        daily['retention'].append(correct_reviews / reviews if reviews else math.nan)
+
+    return {
+        'params': {'intervals': intervals, 'offset': offset},
+        'dates': dates,
+        'daily': daily,
+        'summary': _summarize({key: np.asarray(values, dtype=np.float64) for key, values in daily.items()},
+                              {'words': len(states), 'total_reviews': sum(daily['new']) + sum(daily['reviews'])}),
+    }
+
+
+def print_report(report: Dict, every: int = 30) -> None:
+    """打印每 every 天的指标和汇总"""
+    daily = report['daily']
+    labels = report.get('dates') or [str(day + 1) for day in range(len(daily['reviews']))]
+    print(f"{'天':>10} {'新词':>8} {'复习':>8} {'到期':>8} {'积压':>8} {'保持率':>8}")
+    for day in range(0, len(labels), max(1, every)):
+        print(f"{labels[day]:>10} {daily['new'][day]:>8.1f} {daily['reviews'][day]:>8.1f} "
+              f"{daily['due'][day]:>8.1f} {daily['backlog'][day]:>8.1f} {daily['retention'][day]:>8.3f}")
+    print("\n汇总:")
+    for key, value in report['summary'].items():
+        print(f"  {key}: {value:.3f}" if isinstance(value, float) else f"  {key}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线模拟 MemoryAlgorithm 的复习调度")
+    parser.add_argument('--learners', type=int, default=100)
+    parser.add_argument('--words', type=int)
+    parser.add_argument('--days', type=int)
+    parser.add_argument('--new-per-day', type=int)
+    parser.add_argument('--max-reviews', type=int, default=None)
+    parser.add_argument('--intervals', type=int, nargs='+')
+    parser.add_argument('--offset', type=float)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--journal', help="重放 progress.journal 中的答题记录，而不是随机模拟")
+    parser.add_argument('--every', type=int, default=30, help="每隔多少天打印一行")
+    parser.add_argument('--output', help="把完整结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    if args.journal:
+        report = replay(ProgressJournal(args.journal).records(), args.intervals,
+                        DEFAULT_INTERVAL_OFFSET if args.offset is None else args.offset)
+        every = 1
+    else:
+        report = simulate(args.learners, args.workers, args.seed, words=args.words, days=args.days,
+                          new_per_day=args.new_per_day, max_reviews=args.max_reviews,
+                          intervals=args.intervals, offset=args.offset)
+        every = args.every
+    print_report(report, every)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Collection, Dict, Iterator, List
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress (
+    book TEXT NOT NULL,
+    word TEXT NOT NULL,
+    last_reviewed TEXT,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    correct_count INTEGER NOT NULL DEFAULT 0,
+    difficulty_level INTEGER NOT NULL DEFAULT 0,
+    wrong INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (book, word)
+);
+CREATE INDEX IF NOT EXISTS idx_progress_wrong ON progress(book, wrong);
+CREATE TABLE IF NOT EXISTS schedule (
+    word TEXT PRIMARY KEY,
+    level INTEGER NOT NULL DEFAULT 0,
+    next_review TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_schedule_next_review ON schedule(next_review);
+CREATE TABLE IF NOT EXISTS review_history (
+    book TEXT NOT NULL,
+    date TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (book, date)
+);
+"""
+
+UPSERT_PROGRESS = (
+    "INSERT OR REPLACE INTO progress "
+    "(book, word, last_reviewed, review_count, correct_count, difficulty_level, wrong) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+UPSERT_SCHEDULE = (
+    "INSERT INTO schedule (word, level, next_review) VALUES (?, ?, ?) "
+    "ON CONFLICT(word) DO UPDATE SET level = excluded.level, next_review = excluded.next_review"
+)
+
+
+class StudyStore:
+    """基于 SQLite (WAL 模式) 的学习数据存储
+
+    progress 表按 (词库, 单词) 保存 DataManager 的进度，包括答题计数；
+    schedule 表按单词保存 MemoryAlgorithm 的级别和下次复习时间，不另存计数，
+    读取时按单词汇总各词库的 progress 计数，两边不会各自累计出不同的值。
+    一次答题可以在一个事务里同时写入两张表。
+    """
+
+    def __init__(self, db_file: str = "data/study.db"):
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(db_file) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self):
+        """事务上下文，可嵌套，最外层结束时提交"""
+        self._depth += 1
+        try:
+            yield self
+        except Exception:
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.rollback()
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            self.conn.commit()
+
+    def _commit(self) -> None:
+        if self._depth == 0:
+            self.conn.commit()
+
+    def is_empty(self) -> bool:
+        row = self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM progress) + (SELECT COUNT(*) FROM schedule)"
+        ).fetchone()
+        return row[0] == 0
+
+    # ---- 单词进度 ----
+
+    @staticmethod
+    def _progress_row(book: str, progress: Dict, wrong: bool) -> tuple:
+        return (book, progress['word'], progress['last_reviewed'], progress['review_count'],
+                progress['correct_count'], progress['difficulty_level'], int(wrong))
+
+    def save_word_progress(self, book: str, progress: Dict, wrong: bool) -> None:
+        """写入单个单词在该词库中的进度 (progress 为 Word.to_dict() 的结果)"""
+        self.conn.execute(UPSERT_PROGRESS, self._progress_row(book, progress, wrong))
+        self._commit()
+
+    def save_book_progress(self, book: str, progress: List[Dict], wrong_words: Collection[str]) -> None:
+        """批量写入整本书的进度，从未复习且不在错词本中的单词不写入"""
+        wrong_words = set(wrong_words)
+        self.conn.execute("UPDATE progress SET wrong = 0 WHERE book = ? AND wrong = 1", (book,))
+        self.conn.executemany(
+            UPSERT_PROGRESS,
+            [self._progress_row(book, p, p['word'] in wrong_words) for p in progress
+             if p['review_count'] or p['word'] in wrong_words]
+        )
+        # 错词本中还没有加载到的单词 (分页加载尚未到达) 只更新标记
+        self.conn.executemany(
+            "INSERT INTO progress (book, word, wrong) VALUES (?, ?, 1) "
+            "ON CONFLICT(book, word) DO UPDATE SET wrong = 1",
+            [(book, word) for word in wrong_words]
+        )
+        self._commit()
+
+    def load_book_progress(self, book: str) -> Dict[str, Dict]:
+        """读取整本书的进度，返回 单词 -> 进度字典"""
+        rows = self.conn.execute(
+            "SELECT word, last_reviewed, review_count, correct_count, difficulty_level, wrong "
+            "FROM progress WHERE book = ?", (book,)
+        )
+        return {row['word']: dict(row) for row in rows}
+
+    def books(self) -> List[str]:
+        """有进度或复习历史的词库名"""
+        rows = self.conn.execute(
+            "SELECT book FROM progress UNION SELECT book FROM review_history ORDER BY book"
+        )
+        return [row['book'] for row in rows]
+
+    def add_review(self, book: str, date: str, correct: bool) -> None:
+        """累加当天的复习记录"""
+        self.conn.execute(
+            "INSERT INTO review_history VALUES (?, ?, 1, ?) "
+            "ON CONFLICT(book, date) DO UPDATE SET total = total + 1, correct = correct + excluded.correct",
+            (book, date, int(correct))
+        )
+        self._commit()
+
+    def save_review_history(self, book: str, history: Dict) -> None:
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO review_history VALUES (?, ?, ?, ?)",
+            [(book, date, item['total'], item['correct']) for date, item in history.items()]
+        )
+        self._commit()
+
+    def load_review_history(self, book: str) -> Dict:
+        rows = self.conn.execute(
+            "SELECT date, total, correct FROM review_history WHERE book = ? ORDER BY date", (book,)
+        )
+        return {row['date']: {'total': row['total'], 'correct': row['correct']} for row in rows}
+
+    # ---- 复习计划 ----
+
+    @staticmethod
+    def _schedule_row(word: str, stats: Dict) -> tuple:
+        return (word, stats['level'], stats['next_review'].isoformat())
+
+    def save_schedule(self, word: str, stats: Dict) -> None:
+        """写入单个单词的复习计划 (stats 为 MemoryAlgorithm.word_stats 中的条目，计数不写入)"""
+        self.conn.execute(UPSERT_SCHEDULE, self._schedule_row(word, stats))
+        self._commit()
+
+    def save_all_schedules(self, word_stats: Dict) -> None:
+        self.conn.executemany(UPSERT_SCHEDULE,
+                              [self._schedule_row(word, s) for word, s in word_stats.items()])
+        self._commit()
+
+    def load_schedules(self) -> Dict[str, Dict]:
+        """读取复习计划，答题计数为该单词在各词库 progress 中的计数之和"""
+        rows = self.conn.execute(
+            "SELECT s.word, s.level, s.next_review, "
+            "COALESCE(c.correct_count, 0) AS correct_count, COALESCE(c.total_count, 0) AS total_count "
+            "FROM schedule s LEFT JOIN ("
+            "SELECT word, SUM(correct_count) AS correct_count, SUM(review_count) AS total_count "
+            "FROM progress GROUP BY word) c ON c.word = s.word"
+        )
+        return {
+            row['word']: {
+                'level': row['level'],
+                'next_review': datetime.fromisoformat(row['next_review']),
+                'correct_count': row['correct_count'],
+                'total_count': row['total_count'],
+            }
+            for row in rows
+        }
+
+    def iter_due_words(self, before: datetime) -> Iterator[str]:
+        """按到期时间升序逐个产出 before 之前到期的单词 (走 next_review 索引)
+
+        调用方取够所需的单词即可停止，不必读出全部到期单词。
+        """
+        rows = self.conn.execute(
+            "SELECT word FROM schedule WHERE next_review <= ? ORDER BY next_review",
+            (before.isoformat(),)
+        )
+        for row in rows:
+            yield row['word']
+
+    # ---- JSON 导入导出 ----
+
+    def import_json(self, progress_file: str, stats_file: str) -> None:
+        """从原有的 progress.json / memory_stats.json 导入数据"""
+        with self.transaction():
+            if os.path.exists(progress_file):
+                with open(progress_file, 'r', encoding='utf-8') as f:
+                    progress = json.load(f)
+                # 兼容只有一本词库的旧格式
+                books = progress.get('books') or {progress.get('book', ''): progress}
+                for book, book_progress in books.items():
+                    wrong_words = {p['word'] for p in book_progress.get('wrong_words', [])}
+                    self.save_book_progress(book, book_progress.get('words', []), wrong_words)
+                    self.save_review_history(book, book_progress.get('review_history', {}))
+            if os.path.exists(stats_file):
+                with open(stats_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for stats in data.values():
+                    stats['next_review'] = datetime.fromisoformat(stats['next_review'])
+                self.save_all_schedules(data)
+
+    def export_json(self, progress_file: str, stats_file: str, current_book: str = "") -> None:
+        """按 JSON 格式导出全部词库的进度和复习计划"""
+        books = {}
+        for book in self.books():
+            rows = self.load_book_progress(book)
+            words = [{k: row[k] for k in ('word', 'last_reviewed', 'review_count',
+                                          'correct_count', 'difficulty_level')}
+                     for row in rows.values()]
+            books[book] = {
+                'words': words,
+                'wrong_words': [w for w in words if rows[w['word']]['wrong']],
+                'review_history': self.load_review_history(book)
+            }
+        progress = {'book': current_book or next(iter(books), ''), 'books': books, 'journal_seq': 0}
+        stats = {word: {**s, 'next_review': s['next_review'].isoformat()}
+                 for word, s in self.load_schedules().items()}
+        for path, data in ((progress_file, progress), (stats_file, stats)):
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def cleanup(self) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="学习数据 SQLite 存储的 JSON 导入导出")
+    parser.add_argument('action', choices=['import', 'export'])
+    parser.add_argument('--db', default="data/study.db")
+    parser.add_argument('--book', default="KaoYanluan_1.json")
+    parser.add_argument('--progress', default="data/progress.json")
+    parser.add_argument('--stats', default="data/memory_stats.json")
+    args = parser.parse_args()
+
+    store = StudyStore(args.db)
+    if args.action == 'import':
+        store.import_json(args.progress, args.stats)
+    else:
+        store.export_json(args.progress, args.stats, args.book)
+    store.close()
@@ -1,6 +1,8 @@
 import logging
 import os
 
+_logger = None
+
 def setup_logging():
     """设置日志记录"""
     if not os.path.exists('logs'):
@@ -16,4 +18,15 @@ def setup_logging():
     )
     return logging.getLogger(__name__)
 
-logger = setup_logging()
\ No newline at end of file
+def get_logger():
+    """第一次使用时才创建 logs/ 目录和日志文件"""
+    global _logger
+    if _logger is None:
+        _logger = setup_logging()
+    return _logger
+
+def __getattr__(name):
+    # 兼容 from utils import logger
+    if name == 'logger':
+        return get_logger()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,107 @@
+import queue
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from instrumentation import metrics
+
+
+class WordCache:
+    """按序号缓存已解码单词的 LRU 窗口
+
+    get(index) 命中时直接返回，未命中时通过 loader 解码后放入缓存，
+    超出容量时淘汰最久未使用的条目。开启后台预取时，每次访问后由工作线程
+    解码 index 之后的 prefetch 个单词，并对每个单词调用 warm (例如预渲染卡片)。
+    """
+
+    def __init__(self, loader: Callable[[int], object], size: int = 100, prefetch: int = 20,
+                 background: bool = False, warm: Optional[Callable[[object], None]] = None):
+        self.loader = loader
+        self.size = size
+        self.prefetch = prefetch
+        self.background = background
+        self.warm = warm
+        self.total = 0  # 可用序号范围 [0, total)
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._requests: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def reset(self, total: int) -> None:
+        """词库变化后清空缓存"""
+        with self._lock:
+            self._items.clear()
+            self.total = total
+
+    def _put(self, index: int, item) -> None:
+        self._items[index] = item
+        self._items.move_to_end(index)
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+    def get(self, index: int):
+        with self._lock:
+            item = self._items.get(index)
+            if item is not None:
+                self._items.move_to_end(index)
+                self.hits += 1
+        metrics.count('cache.hit' if item is not None else 'cache.miss')
+        if item is None:
+            item = self.loader(index)
+            with self._lock:
+                self.misses += 1
+                self._put(index, item)
+        if self.background and self.prefetch > 0:
+            self._schedule(index + 1)
+        return item
+
+    def _schedule(self, start: int) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="word-prefetch", daemon=True)
+            self._worker.start()
+        self._requests.put(start)
+
+    def _run(self) -> None:
+        while True:
+            start = self._requests.get()
+            if start is None:
+                return
+            for index in range(start, min(start + self.prefetch, self.total)):
+                # 有新的预取请求时放弃当前窗口
+                if not self._requests.empty():
+                    break
+                with self._lock:
+                    cached = index in self._items
+                if cached:
+                    continue
+                try:
+                    item = self.loader(index)
+                    if self.warm is not None:
+                        self.warm(item)
+                except Exception:
+                    break
+                with self._lock:
+                    self._put(index, item)
+                    self.prefetched += 1
+
+    def stats(self) -> Dict:
+        """缓存命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'prefetched': self.prefetched,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'cached': len(self._items),
+            'capacity': self.size,
+        }
+
+    def close(self) -> None:
+        """停止预取线程"""
+        if self._worker is not None:
+            self._requests.put(None)
+            self._worker.join(timeout=1)
+            self._worker = None
@@ -1,48 +1,123 @@
+import gc
 import json
-import requests
 from datetime import datetime
 import random
 import os
-from typing import List, Dict, Optional
-from collections import deque
+import re
+import sys
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+from itertools import islice
+from progress_journal import ProgressJournal
+from book_compiler import CompiledBook, compile_book, compiled_path, is_fresh
+from word_cache import WordCache
+from json_stream import check_entry, iter_book
+from progress_columns import ProgressColumns
+from search_index import SearchHit, SearchIndex, build_if_stale, load_or_build
+from bk_tree import BKTree, load_or_build_tree
+from instrumentation import metrics
+
+# tranCn 中分隔不同义项的标点
+MEANING_SEPARATORS = re.compile(r"[；;，,、/]")
 
 class Word:
-    def __init__(self, data: Dict):
+    """单词对象
+
+    只保存词头、排名和学习进度，音标、例句、翻译等内容保留在原始词条中，
+    访问对应属性时才解析，原始词条与词库共享而不复制。
+    """
+    __slots__ = ('word', '_data', '_source', '_index', 'last_reviewed', 'review_count',
+                 'correct_count', 'difficulty_level')
+
+    def __init__(self, data: Optional[Dict], headword: str = None, source=None, index: int = 0):
         # 基础信息
-        self.word = data.get("headWord", "")
-        self.word_rank = data.get("wordRank", 0)
-        
-        # 获取 content.word 内容
-        word_content = data.get("content", {}).get("word", {})
-        
-        # 音标
-        self.phonetics = word_content.get("content", {}).get("usphone", "")  # 美式音标
-        self.uk_phonetics = word_content.get("content", {}).get("ukphone", "")  # 英式音标
-        
-        # 例句 - 需要从 content 中获取
-        self.examples = word_content.get("content", {}).get("sentence", {}).get("sentences", [])
-        
-        # 翻译和词性
-        self.translation = word_content.get("content", {}).get("trans", [])
-        
-        # 同近义词
-        self.synonyms = word_content.get("content", {}).get("syno", {}).get("synos", [])
-        
-        # 短语
-        self.phrases = word_content.get("content", {}).get("phrase", {}).get("phrases", [])
-        
-        # 记忆方法
-        self.memory_method = word_content.get("content", {}).get("remMethod", {}).get("val", "")
-        
-        # 同根词
-        self.related_words = word_content.get("content", {}).get("relWord", {}).get("rels", [])
-        
+        self.word = sys.intern(headword if data is None else data.get("headWord", ""))
+
+        # 原始词条；来自编译词库时由 source.entry(index) 按需解码
+        self._data = data
+        self._source = source
+        self._index = index
+
         # 学习进度相关属性
         self.last_reviewed = None
         self.review_count = 0
         self.correct_count = 0
         self.difficulty_level = 0
 
+    @classmethod
+    def from_source(cls, source, index: int, headword: str = None) -> 'Word':
+        """从编译词库创建单词对象，只读取词头"""
+        return cls(None, headword=headword or source.headword(index), source=source, index=index)
+
+    @property
+    def data(self) -> Dict:
+        """原始词条
+
+        后台预取线程和主线程可能同时首次访问: 先读出 _source 再解码，
+        并且先写 _data 再清空 _source，另一个线程看到 _source 已清空时 _data 必定已写入。
+        两个线程都解码时结果相同，只是多解码一次。
+        """
+        data = self._data
+        if data is None:
+            source = self._source
+            if source is None:
+                return self._data
+            data = source.entry(self._index)
+            self._data = data
+            self._source = None
+        return data
+
+    @property
+    def word_rank(self) -> int:
+        return self.data.get("wordRank", 0)
+
+    def _content(self) -> Dict:
+        """获取 content.word.content 内容"""
+        return self.data.get("content", {}).get("word", {}).get("content", {})
+
+    @property
+    def phonetics(self) -> str:
+        """美式音标"""
+        return self._content().get("usphone", "")
+
+    @property
+    def uk_phonetics(self) -> str:
+        """英式音标"""
+        return self._content().get("ukphone", "")
+
+    @property
+    def examples(self) -> List[Dict]:
+        """例句"""
+        return self._content().get("sentence", {}).get("sentences", [])
+
+    @property
+    def translation(self) -> List[Dict]:
+        """翻译和词性"""
+        return self._content().get("trans", [])
+
+    @property
+    def synonyms(self) -> List[Dict]:
+        """同近义词"""
+        return self._content().get("syno", {}).get("synos", [])
+
+    @property
+    def phrases(self) -> List[Dict]:
+        """短语"""
+        return self._content().get("phrase", {}).get("phrases", [])
+
+    @property
+    def memory_method(self) -> str:
+        """记忆方法"""
+        return self._content().get("remMethod", {}).get("val", "")
+
+    @property
+    def related_words(self) -> List[Dict]:
+        """同根词"""
+        return self._content().get("relWord", {}).get("rels", [])
+
     def get_translations(self) -> List[str]:
         """获取所有中文翻译"""
         translations = []
@@ -53,6 +128,16 @@ class Word:
                 translations.append(f"{pos_str}{trans['tranCn']}")
         return translations
 
+    def get_meanings(self) -> List[str]:
+        """把中文释义拆成单个义项，用于判断输入的释义是否正确"""
+        meanings = []
+        for trans in self.translation:
+            for meaning in MEANING_SEPARATORS.split(trans.get("tranCn", "")):
+                meaning = meaning.strip()
+                if meaning and meaning not in meanings:
+                    meanings.append(meaning)
+        return meanings
+
     def get_example_sentences(self) -> List[Dict[str, str]]:
         """获取例句"""
         return [
@@ -87,187 +172,814 @@ class Word:
     def from_dict(cls, progress_data: Dict, original_data: Dict) -> 'Word':
         """从进度字典和原始数据创建单词对象"""
         word = cls(original_data)  # 使用原始数据创建对象
-        word.last_reviewed = datetime.fromisoformat(progress_data['last_reviewed']) if progress_data.get('last_reviewed') else None
-        word.review_count = progress_data.get('review_count', 0)
-        word.correct_count = progress_data.get('correct_count', 0)
-        word.difficulty_level = progress_data.get('difficulty_level', 0)
+        word.apply_progress(progress_data)
+        return word
+
+    def apply_progress(self, progress_data: Dict) -> None:
+        """将进度字典中的学习状态写入当前对象"""
+        self.last_reviewed = datetime.fromisoformat(progress_data['last_reviewed']) if progress_data.get('last_reviewed') else None
+        self.review_count = progress_data.get('review_count', 0)
+        self.correct_count = progress_data.get('correct_count', 0)
+        self.difficulty_level = progress_data.get('difficulty_level', 0)
+
+class SampleSet:
+    """支持 O(1) 增删、成员判断和随机抽样的单词集合"""
+
+    def __init__(self):
+        self._items: List[Word] = []
+        self._positions: Dict[str, int] = {}
+
+    def add(self, word: Word) -> None:
+        if word.word not in self._positions:
+            self._positions[word.word] = len(self._items)
+            self._items.append(word)
+
+    def discard(self, word: Word) -> None:
+        """与末尾元素交换后弹出"""
+        index = self._positions.pop(word.word, None)
+        if index is None:
+            return
+        last = self._items.pop()
+        if index < len(self._items):
+            self._items[index] = last
+            self._positions[last.word] = index
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._positions.clear()
+
+    def sample(self, count: int) -> List[Word]:
+        return random.sample(self._items, min(count, len(self._items)))
+
+    def __contains__(self, word: Word) -> bool:
+        return word.word in self._positions
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+class BookWords(Sequence):
+    """编译词库的单词列表，第一次访问某个序号时才创建单词对象
+
+    打开词库时只分配与词条数等长的空位，不读取词头。
+    后台预取线程也会访问，创建单词对象时加锁，保证同一序号只有一个对象。
+    """
+
+    def __init__(self, book: CompiledBook):
+        self.book = book
+        self._words: List[Optional[Word]] = [None] * len(book)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __getitem__(self, index: int) -> Word:
+        word = self._words[index]
+        if word is None:
+            with self._lock:
+                word = self._words[index]
+                if word is None:
+                    if index < 0:
+                        index += len(self._words)
+                    word = self._words[index] = Word.from_source(self.book, index)
         return word
 
+    def __iter__(self) -> Iterator[Word]:
+        for index in range(len(self._words)):
+            yield self[index]
+
+    def loaded(self) -> Iterator[Word]:
+        """已创建的单词对象，没有创建的单词不可能有学习进度"""
+        return (word for word in self._words if word is not None)
+
+    def headwords(self) -> List[str]:
+        return self.book.headwords()
+
+class BookWordMap(Mapping):
+    """编译词库的词头 -> 单词对象，通过文件中的词头索引二分查找，不建立字典"""
+
+    def __init__(self, words: BookWords):
+        self.words = words
+
+    def __getitem__(self, headword: str) -> Word:
+        index = self.words.book.find(headword)
+        if index is None:
+            raise KeyError(headword)
+        return self.words[index]
+
+    def __contains__(self, headword) -> bool:
+        return self.words.book.find(headword) is not None
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words.headwords())
+
+def loaded_words(words: Sequence) -> Iterable[Word]:
+    """可能有学习进度的单词: 编译词库只取已创建的单词对象"""
+    return words.loaded() if isinstance(words, BookWords) else words
+
+class BookState:
+    """单本词库在内存中的学习状态，切换词库时整体换入换出"""
+    __slots__ = ('words', 'word_map', 'wrong_words', 'weak_words', 'review_history', 'columns',
+                 'search_index')
+
+    def __init__(self, words=None, word_map=None, wrong_words=None, weak_words=None,
+                 review_history=None, columns=None, search_index=None):
+        self.words: List[Word] = words if words is not None else []
+        self.word_map: Dict[str, Word] = word_map if word_map is not None else {}
+        self.wrong_words: Dict[str, Word] = wrong_words if wrong_words is not None else {}
+        self.weak_words: SampleSet = weak_words if weak_words is not None else SampleSet()
+        self.review_history: Dict = review_history if review_history is not None else {}
+        self.columns: ProgressColumns = columns if columns is not None else ProgressColumns()
+        self.search_index: Optional[SearchIndex] = search_index
+
+@contextmanager
+def gc_paused():
+    """暂停循环垃圾回收
+
+    加载词库时一次创建几十万个长期存活的字典和单词对象，其中没有循环引用，
+    分代回收只会反复扫描它们，暂停后加载时间可减少一半以上。
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def compile_if_possible(filepath: str) -> Optional[str]:
+    """编译词库，文件无法写入时返回 None (之后按 JSON 加载)，可在子进程中执行"""
+    try:
+        with gc_paused():
+            return compile_book(filepath)
+    except OSError:
+        return None
+    except ValueError as e:
+        raise Exception(f"加载词库失败: {str(e)}")
+
+# 加载阶段的显示名称
+LOAD_STAGES = {
+    'read_progress': '读取进度',
+    'join': '读取词库并合并进度',
+    'replay': '重放日志',
+    'index': '搜索索引',
+    'columns': '统计数组',
+}
+
 class DataManager:
-    def __init__(self, source_type="local"):
+    def __init__(self, source_type="local", store=None, cache_size=100, prefetch_count=20,
+                 background_prefetch=False, api_options: Optional[Dict] = None, memory=None,
+                 persister=None, progress_file: str = "data/progress.json"):
         self.source_type = source_type
+        self.store = store  # 可选的 StudyStore，设置后进度写入 SQLite 而不是 JSON
+        self.memory = memory  # 可选的 MemoryAlgorithm，用于把复习计划同步到 columns
         self.words: List[Word] = []
-        self.words_data: List[Dict] = []  # 保存原始数据
+        self.word_map: Dict[str, Word] = {}  # 词头 -> 单词对象
+        self.weak_words = SampleSet()  # 正确率低于 80% 的已复习单词
+        self.columns = ProgressColumns()  # 与 words 平行的进度数组
+        self.search_index: Optional[SearchIndex] = None  # 第一次搜索时读取缓存或构建
+        self.book_sources: Dict[str, str] = {}  # 书名 -> 本地词库文件，用于缓存索引
+        self.spelling_trees: Dict[str, BKTree] = {}  # 书名 -> 词头 BK 树，首次使用时构建
         self.current_book = ""
-        self.progress_file = "data/progress.json"
-        self.wrong_words: List[Word] = []
+        self.books: Dict[str, BookState] = {}  # 已加载的词库，书名 -> 学习状态
+        self.entry_table: Dict[str, Dict] = {}  # 词头 -> 原始词条，多本词库共享
+        self.compiled_books: List[CompiledBook] = []  # 已打开的编译词库
+        self._saved_books: Dict[str, Dict] = {}  # 进度文件中各词库的进度，未加载的词库保存时原样写回
+        self._progress_cache: Optional[tuple] = None  # ((文件大小, 修改时间), 解析后的进度文件)
+        self.load_stages: Dict[str, float] = {}  # 最近一次加载各阶段的耗时 (毫秒)
+        self.progress_file = progress_file
+        # 日志与进度快照放在一起: data/progress.json -> data/progress.journal
+        self.journal = ProgressJournal(os.path.splitext(progress_file)[0] + ".journal")
+        self.wrong_words: Dict[str, Word] = {}  # 错词本，词头 -> 单词对象，保持加入顺序
         self.review_history: Dict = {}
-        self.cache_size = 100
-        self.word_cache = deque(maxlen=self.cache_size)
-        self.current_index = 0
+        self.cache_size = cache_size
+        self.word_cache = WordCache(self._load_word, size=cache_size, prefetch=prefetch_count,
+                                    background=background_prefetch)
+        self.api_options = api_options or {}  # PagedBookClient 参数
+        self.background_load = None  # 分页加载时的 api_connector.BackgroundLoad
+        # 分页加载期间，尚未到达的单词的进度暂存于此，单词到达时再应用
+        self._pending: Optional[Dict[str, Dict]] = None
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()  # 同一时间只写一份快照
+        # 可选的 WriteBehindPersister: 日志改由后台线程落盘，快照也在后台写入
+        self.persister = persister
+        if persister is not None and store is None:
+            self.journal.fsync = False
+            persister.register('journal', self._sync_journal)
+            persister.register('progress', self.save_progress)
 
+    @metrics.timed('data.load')
     def load_data(self, source: str) -> None:
-        """加载词库和学习进度"""
-        self.current_book = os.path.basename(source)
+        """加载词库和学习进度，并设为当前词库
+
+        本地 JSON 词库先编译为 .wbk，之后启动时直接以 mmap 打开，不再解析和校验 JSON。
+        """
+        if self.source_type == "local":
+            self._compile_stale([source])
+        self._begin_book(os.path.basename(source))
         if self.source_type == "local":
             self.load_local(source)
         elif self.source_type == "remote":
             self.load_remote(source)
-        self.load_progress()
+        elif self.source_type == "api":
+            self.load_api(source)
+        self._finish_book()
+
+    @metrics.timed('data.load')
+    def load_books(self, sources: List[str], workers: Optional[int] = None) -> None:
+        """加载多本本地词库，相同词头的词条在内存中只保留一份
+
+        没有最新编译文件的词库先在进程池中并行编译，之后全部以 mmap 打开，
+        主进程不解析 JSON。加载完成后第一本为当前词库。
+        """
+        self._compile_stale(sources, workers)
+        for source in sources:
+            self._begin_book(os.path.basename(source))
+            self.load_local(source)
+            self._finish_book()
+        self.switch_book(os.path.basename(sources[0]))
+
+    def _compile_stale(self, sources: List[str], workers: Optional[int] = None) -> None:
+        """编译没有最新编译文件的 JSON 词库，多本时在进程池中并行编译"""
+        stale = [source for source in sources
+                 if not source.endswith('.wbk') and not is_fresh(source, compiled_path(source))]
+        if len(stale) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers or min(len(stale), os.cpu_count() or 1)) as pool:
+                list(pool.map(compile_if_possible, stale))
+        elif stale:
+            compile_if_possible(stale[0])
+
+    @metrics.timed('data.switch_book')
+    def switch_book(self, name: str) -> None:
+        """切换当前词库，不重新加载或解析"""
+        if name not in self.books:
+            raise ValueError(f"词库未加载: {name}")
+        with self._lock:
+            self._stash_book()
+            self._restore_book(name, self.books[name])
+
+    def _restore_book(self, name: str, state: BookState) -> None:
+        self.current_book = name
+        self.words = state.words
+        self.word_map = state.word_map
+        self.wrong_words = state.wrong_words
+        self.weak_words = state.weak_words
+        self.review_history = state.review_history
+        self.columns = state.columns
+        self.search_index = state.search_index
+        self.word_cache.reset(len(self.words))
+
+    def _stash_book(self) -> None:
+        """把当前词库的状态保存到 books 中"""
+        if self.current_book:
+            self.books[self.current_book] = BookState(self.words, self.word_map, self.wrong_words,
+                                                      self.weak_words, self.review_history, self.columns,
+                                                      self.search_index)
+
+    def _begin_book(self, name: str) -> None:
+        self.load_stages = {}
+        with self._lock:
+            self._stash_book()
+            self._restore_book(name, BookState())
+
+    def _finish_book(self) -> None:
+        with self._lock:
+            with self._stage('columns'):
+                self.columns = self._build_columns()
+            self._stash_book()
+            self.word_cache.reset(len(self.words))
+        stages = ", ".join(f"{LOAD_STAGES[name]} {ms:.1f} ms" for name, ms in self.load_stages.items())
+        print(f"成功加载 {self.current_book}: {len(self.words)} 个单词 ({stages})")
+
+    @contextmanager
+    def _stage(self, name: str):
+        """记录加载过程中一个阶段的耗时"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.load_stages[name] = self.load_stages.get(name, 0.0) + elapsed * 1000
+            metrics.observe(f'load.{name}', elapsed)
+
+    def _share_entry(self, word_data: Dict) -> Dict:
+        """返回共享词条表中同一词头的词条"""
+        return self.entry_table.setdefault(word_data["headWord"], word_data)
 
     def load_local(self, filepath: str) -> None:
-        """加载本地词库"""
+        """加载本地词库，存在最新的编译文件时直接使用编译词库
+
+        JSON 词库边读取边创建单词并合并进度，整个文件只遍历一次。
+        """
+        book_path = filepath if filepath.endswith('.wbk') else compiled_path(filepath)
+        if is_fresh(filepath, book_path):
+            book = self.load_compiled(book_path)
+            source = filepath if os.path.exists(filepath) else book_path
+            self.book_sources[self.current_book] = source
+            self._load_search_index(source, book.iter_entries)
+            return
         try:
-            with open(filepath, 'r', encoding='utf-8') as file:
-                self.words_data = json.load(file)
-                # 检查数据是否成功加载
-                if not self.words_data:
-                    raise ValueError("词库数据为空")
-                    
-                # 检查数据结构
-                for word_data in self.words_data:
-                    if "headWord" not in word_data or "content" not in word_data:
-                        raise ValueError(f"无效的单词数据格式: {word_data.get('headWord', 'unknown')}")
-                        
-                self.words = [Word(word_data) for word_data in self.words_data]
-                print(f"成功加载 {len(self.words)} 个单词")
-                
+            self._join_progress(Word(self._share_entry(word_data)) for word_data in iter_book(filepath))
         except FileNotFoundError:
-            raise FileNotFoundError(f"找不到词库文件: {filepath}")
-        except json.JSONDecodeError:
-            raise ValueError(f"词库文件 {filepath} 格式错误")
+            raise
         except Exception as e:
             raise Exception(f"加载词库失败: {str(e)}")
+        self.book_sources[self.current_book] = filepath
+        self._load_search_index(filepath, lambda: (word.data for word in self.words))
 
-    def load_remote(self, api_url: str) -> None:
-        response = requests.get(api_url)
-        if response.status_code == 200:
-            data = response.json()
-            self.words = [Word(word) for word in data]
+    def load_compiled(self, book_path: str) -> CompiledBook:
+        """以 mmap 打开编译词库
+
+        不逐个读取词头: 单词对象在第一次访问时创建，按词头查找使用文件中的词头索引，
+        只有进度中出现过的单词在合并进度时创建，打开词库的耗时与词库大小基本无关。
+        """
+        book = CompiledBook(book_path, shared=self.entry_table)
+        self.compiled_books.append(book)
+        self._join_progress(BookWords(book))
+        return book
+
+    def _load_search_index(self, source: str, entries) -> None:
+        """检查本地词库的搜索索引缓存，缓存文件与词库放在同一目录
+
+        缓存失效时在加载时重新构建并写回；缓存有效时不读取，第一次搜索时再读取，
+        不用搜索的会话不必反序列化整个索引。
+        """
+        with self._stage('index'), gc_paused():
+            self.search_index = build_if_stale(source, entries)
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """在当前词库中搜索词头、中文释义、例句和短语"""
+        with self._lock:
+            name = self.current_book
+            index = self.search_index
+            source = self.book_sources.get(name)
+            words = self.words
+        if index is None:
+            # 读取缓存或构建时不持有锁，不影响答题写入
+            with metrics.timer('search.load_index'), gc_paused():
+                if source is not None:
+                    index = load_or_build(source, lambda: (word.data for word in words))
+                else:
+                    # 远程词库没有缓存文件，按已加载的单词构建
+                    index = SearchIndex.build(word.data for word in words)
+            with self._lock:
+                if name == self.current_book and self.search_index is None:
+                    self.search_index = index
+        with metrics.timer('search.query'):
+            return index.search(query, limit)
+
+    @metrics.timed('data.spelling_tree')
+    def spelling_tree(self) -> BKTree:
+        """当前词库词头的 BK 树，本地词库的树缓存在词库旁边"""
+        with self._lock:
+            name = self.current_book
+            tree = self.spelling_trees.get(name)
+            if tree is not None:
+                return tree
+            source = self.book_sources.get(name)
+            headwords = list(self.word_map)
+        # 构建时不持有锁，不影响答题写入
+        if source is not None:
+            tree = load_or_build_tree(source, headwords)
         else:
-            raise Exception("远程数据加载失败")
+            tree = BKTree.build(headwords)
+        with self._lock:
+            return self.spelling_trees.setdefault(name, tree)
+
+    def suggest_words(self, text: str, limit: int = 5) -> List[str]:
+        """与输入拼写最接近的词头，用于“你是不是要找”"""
+        with metrics.timer('search.suggest'):
+            return [word for _, word in self.spelling_tree().nearest(text, limit=limit)]
+
+    def find_word(self, headword: str) -> Optional[Word]:
+        """按词头查找单词"""
+        return self.word_map.get(headword)
+
+    def load_remote(self, api_url: str) -> None:
+        """加载远程词库，边下载边解析，未变化时直接使用本地缓存"""
+        from remote_loader import RemoteBookLoader  # requests 只在使用远程词库时导入
+        loader = RemoteBookLoader()
+        try:
+            self._join_progress(self._remote_words(loader.iter_entries(api_url)))
+        finally:
+            loader.close()
+        if not self.words:
+            raise ValueError("词库数据为空")
+
+    def _remote_words(self, entries: Iterable[Dict]) -> Iterator[Word]:
+        for word_data in entries:
+            yield Word(self._share_entry(check_entry(word_data)))
+
+    def load_api(self, api_url: str) -> None:
+        """分页加载远程词库，第一页到达后即返回，其余页在后台继续下载"""
+        from api_connector import BackgroundLoad, PagedBookClient
+        self.words = []
+        self.word_map = {}
+        self._pending = {}
+        client = PagedBookClient(api_url, **self.api_options)
+        self.background_load = BackgroundLoad(client, self).start()
+        self.background_load.wait_first_page()
+        # 已到达的单词直接合并进度，之后到达的单词由 extend_words 应用暂存的进度
+        self.load_progress()
+        print(f"已加载第一页 {len(self.words)} 个单词，其余单词在后台加载")
 
+    def extend_words(self, entries: List[Dict]) -> None:
+        """追加一批词条，并应用暂存的进度"""
+        with self._lock:
+            new_words = []
+            for word_data in entries:
+                word = Word(self._share_entry(check_entry(word_data)))
+                if word.word in self.word_map:
+                    continue
+                self.words.append(word)
+                self.word_map[word.word] = word
+                new_words.append(word)
+                pending = self._pending.pop(word.word, None) if self._pending else None
+                if pending is not None:
+                    self._apply_pending(word, pending)
+            self.columns.append(new_words, self._word_stats())
+            self.word_cache.total = len(self.words)
+            self.search_index = None  # 下次搜索时包含新到达的单词
+            self.spelling_trees.pop(self.current_book, None)
+
+    def finish_extend(self, error: Optional[BaseException] = None) -> None:
+        """分页加载结束，丢弃不属于该词库的暂存进度
+
+        后台加载失败时提示用户，并保留尚未到达的单词的暂存进度，保存快照时照常写回。
+        """
+        with self._lock:
+            if error is None:
+                self._pending = None
+                return
+            count = len(self.words)
+        print(f"\n远程词库后台加载失败，只加载了 {count} 个单词: {error}")
+
+    def _pending_progress(self) -> Tuple[List[Dict], List[Dict], set]:
+        """分页加载期间尚未到达的单词: (快照中的进度, 错词本条目, 有待重放答题记录的词头)"""
+        if not self._pending:
+            return [], [], set()
+        progress = [pending['progress'] for pending in self._pending.values()
+                    if pending['progress'] is not None]
+        wrong = [pending['progress'] or {'word': word_name}
+                 for word_name, pending in self._pending.items() if pending['wrong']]
+        answered = {word_name for word_name, pending in self._pending.items() if pending['answers']}
+        return progress, wrong, answered
+
+    def _defer(self, word_name: str) -> Optional[Dict]:
+        """分页加载期间为尚未到达的单词返回暂存条目"""
+        if self._pending is None:
+            return None
+        return self._pending.setdefault(word_name, {'progress': None, 'wrong': False, 'answers': []})
+
+    def _apply_pending(self, word: Word, pending: Dict) -> None:
+        if pending['progress'] is not None:
+            word.apply_progress(pending['progress'])
+        if pending['wrong']:
+            self.wrong_words[word.word] = word
+        for record in pending['answers']:
+            self._apply_answer(word, record['correct'], datetime.fromisoformat(record['time']))
+        self._update_weak_word(word)
+
+    @metrics.timed('data.save_progress')
     def save_progress(self) -> None:
-        """保存学习进度"""
-        progress = {
-            'book': self.current_book,
-            'words': [word.to_dict() for word in self.words],
-            'wrong_words': [word.to_dict() for word in self.wrong_words],
-            'review_history': self.review_history
-        }
-        os.makedirs(os.path.dirname(self.progress_file), exist_ok=True)
-        with open(self.progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress, f, ensure_ascii=False, indent=2)
+        """保存全部已加载词库的进度快照，并从日志中去掉已合并的记录
+
+        快照在锁内生成，序列化和写盘时不持有锁，期间的答题照常追加日志，
+        重写日志时保留这些记录。
+        """
+        with self._save_lock:
+            with self._lock:
+                self._stash_book()
+                # 分页加载尚未完成时，还没到达的单词的进度也写入快照，不能丢失
+                pending_progress, pending_wrong, pending_answered = self._pending_progress()
+                if self.store is not None:
+                    with self.store.transaction():
+                        for name, state in self.books.items():
+                            wrong = list(state.wrong_words.keys())
+                            if name == self.current_book:
+                                wrong += [p['word'] for p in pending_wrong]
+                            words = [word.to_dict() for word in loaded_words(state.words)]
+                            self.store.save_book_progress(name, words, wrong)
+                            self.store.save_review_history(name, state.review_history)
+                    return
+                books = dict(self._saved_books)
+                for name, state in self.books.items():
+                    books[name] = {
+                        'words': [word.to_dict() for word in loaded_words(state.words)],
+                        'wrong_words': [word.to_dict() for word in state.wrong_words.values()],
+                        'review_history': {date: dict(day) for date, day in state.review_history.items()}
+                    }
+                if pending_progress or pending_wrong:
+                    books[self.current_book]['words'] += pending_progress
+                    books[self.current_book]['wrong_words'] += pending_wrong
+                current_book = self.current_book
+                snapshot_seq = self.journal.last_seq
+                progress = {
+                    'book': self.current_book,
+                    'books': books,
+                    'journal_seq': snapshot_seq
+                }
+
+            os.makedirs(os.path.dirname(self.progress_file), exist_ok=True)
+            tmp_file = self.progress_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(progress, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.progress_file)
 
+            with self._lock:
+                self._saved_books = books
+                # 尚未加载的词库的日志记录、尚未到达的单词的答题记录，以及快照之后新增的记录，
+                # 重新编号后写入新日志
+                kept = [record for record in self.journal.records()
+                        if record.get('book') not in self.books or record.get('seq', 0) > snapshot_seq
+                        or (record.get('book') == current_book and record.get('word') in pending_answered)]
+                self.journal.rewrite(kept)
+
+    @metrics.timed('data.load_progress')
     def load_progress(self) -> None:
-        """加载学习进度"""
-        if os.path.exists(self.progress_file):
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                progress = json.load(f)
-                if progress.get('book') == self.current_book:
-                    # 创建单词原始数据的映射
-                    word_data_map = {word['headWord']: word for word in self.words_data}
-                    
-                    # 使用进度数据和原始数据重建单词列表
-                    self.words = []
-                    for word_progress in progress['words']:
-                        word_name = word_progress['word']
-                        if word_name in word_data_map:
-                            word = Word.from_dict(word_progress, word_data_map[word_name])
-                            self.words.append(word)
-                    
-                    # 处理错词本
-                    self.wrong_words = []
-                    for word_progress in progress['wrong_words']:
-                        word_name = word_progress['word']
-                        if word_name in word_data_map:
-                            word = Word.from_dict(word_progress, word_data_map[word_name])
-                            self.wrong_words.append(word)
-                    
-                    self.review_history = progress.get('review_history', {})
-
-    def _preload_words(self, start_index: int, count: int = 20):
-        """预加载单词到缓存"""
-        end_index = min(start_index + count, len(self.words))
-        self.word_cache.extend(self.words[start_index:end_index])
+        """把学习进度重新合并到当前已加载的单词上，再重放快照之后的日志记录"""
+        with self._lock:
+            self._join_progress(self.words if isinstance(self.words, BookWords) else list(self.words))
+            self.columns = self._build_columns()
+            self._stash_book()
+
+    def _read_progress_file(self) -> Dict:
+        """读取进度文件，旧版单词库格式转换为 books 格式
+
+        文件未变化时复用上次的解析结果，加载多本词库时只解析一次。
+        """
+        if not os.path.exists(self.progress_file):
+            return {'books': {}, 'journal_seq': 0}
+        stat = os.stat(self.progress_file)
+        key = (stat.st_size, stat.st_mtime_ns)
+        if self._progress_cache is not None and self._progress_cache[0] == key:
+            return self._progress_cache[1]
+        with open(self.progress_file, 'r', encoding='utf-8') as f:
+            progress = json.load(f)
+        if 'books' not in progress:
+            book = progress.get('book', '')
+            progress = {
+                'books': {book: {
+                    'words': progress.get('words', []),
+                    'wrong_words': progress.get('wrong_words', []),
+                    'review_history': progress.get('review_history', {})
+                }},
+                'journal_seq': progress.get('journal_seq', 0)
+            }
+        self._progress_cache = (key, progress)
+        return progress
+
+    def _read_book_progress(self) -> Tuple[Dict[str, Dict], List[str], Dict, Optional[int]]:
+        """读取当前词库的进度
+
+        返回 (词头 -> 进度, 错词本词头 (按加入顺序), 复习历史, 需要从哪条之后重放日志)。
+        使用 StudyStore 时不重放日志，最后一项为 None。
+        """
+        if self.store is not None:
+            rows = self.store.load_book_progress(self.current_book)
+            wrong = [word_name for word_name, row in rows.items() if row['wrong']]
+            return rows, wrong, self.store.load_review_history(self.current_book), None
+        progress = self._read_progress_file()
+        self._saved_books = progress['books']
+        book_progress = progress['books'].get(self.current_book)
+        if book_progress is None:
+            return {}, [], self.review_history, progress['journal_seq']
+        by_word = {word_progress['word']: word_progress for word_progress in book_progress['words']}
+        wrong = [word_progress['word'] for word_progress in book_progress['wrong_words']]
+        return by_word, wrong, book_progress.get('review_history', {}), progress['journal_seq']
+
+    def _join_progress(self, words: Iterable[Word]) -> None:
+        """按词头把单词与进度合并，一次遍历完成写入进度、词头索引和薄弱单词
+
+        单词保持词库中的顺序；词库中有而进度中没有的是新词，照常保留。
+        编译词库不遍历单词，只按进度中的词头查找。
+        进度中有而词库中还没有的单词，分页加载时暂存，等单词到达后再应用。
+        """
+        with self._stage('read_progress'), gc_paused():
+            by_word, wrong, review_history, journal_seq = self._read_book_progress()
+        with self._stage('join'), gc_paused():
+            self.weak_words.clear()
+            if isinstance(words, BookWords):
+                self._join_compiled(words, by_word)
+            else:
+                self._join_words(words, by_word)
+
+            # 错词本与单词列表共享同一对象，保持原来的加入顺序
+            self.wrong_words = {word_name: self.word_map[word_name]
+                                for word_name in wrong if word_name in self.word_map}
+            if self._pending is not None:
+                wrong_names = set(wrong)
+                for word_name, word_progress in by_word.items():
+                    if word_name not in self.word_map:
+                        pending = self._defer(word_name)
+                        pending['progress'] = word_progress
+                        pending['wrong'] = word_name in wrong_names
+            self.review_history = review_history
+        if journal_seq is not None:
+            with self._stage('replay'):
+                self._replay_journal(journal_seq)
+
+    def _join_words(self, words: Iterable[Word], by_word: Dict[str, Dict]) -> None:
+        self.words = []
+        self.word_map = {}
+        for word in words:
+            if word.word in self.word_map:
+                continue  # 重复的词头只保留第一个
+            word_progress = by_word.get(word.word)
+            if word_progress is not None:
+                word.apply_progress(word_progress)
+                if self._is_weak(word):
+                    self.weak_words.add(word)
+            self.words.append(word)
+            self.word_map[word.word] = word
+
+    def _join_compiled(self, words: BookWords, by_word: Dict[str, Dict]) -> None:
+        """编译词库只为有学习记录的单词查找词头索引并创建单词对象
+
+        旧版快照保存了全部单词，其中从未复习的单词进度都是默认值，直接跳过。
+        """
+        self.words = words
+        self.word_map = BookWordMap(words)
+        for word_name, word_progress in by_word.items():
+            if not word_progress.get('review_count') and not word_progress.get('last_reviewed'):
+                continue
+            word = self.word_map.get(word_name)
+            if word is not None:
+                word.apply_progress(word_progress)
+                if self._is_weak(word):
+                    self.weak_words.add(word)
+
+    def _build_columns(self) -> ProgressColumns:
+        if isinstance(self.words, BookWords):
+            return ProgressColumns.for_book(len(self.words), self.words.book.find, self.words.loaded(),
+                                            self._word_stats())
+        return ProgressColumns(self.words, self._word_stats())
+
+    def _replay_journal(self, after_seq: int) -> None:
+        """在已加载的进度上重放日志"""
+        word_map = self.word_map
+        for record in self.journal.replay(after_seq):
+            if record.get('book') != self.current_book:
+                continue
+            word = word_map.get(record['word'])
+            if word is not None:
+                self._apply_answer(word, record['correct'], datetime.fromisoformat(record['time']))
+            elif self._defer(record['word']) is not None:
+                self._defer(record['word'])['answers'].append(record)
+
+    @metrics.timed('cache.load_word')
+    def _load_word(self, index: int) -> Word:
+        """解码单词内容，供 WordCache 在未命中或预取时调用"""
+        word = self.words[index]
+        word.data  # 访问 data 即完成解码
+        return word
 
     def get_word(self, index: int) -> Optional[Word]:
-        """获取单词，支持缓存"""
+        """获取单词，经过 LRU 窗口缓存，可在后台预取后续单词"""
         if not self.words:
             raise ValueError("词库为空")
-            
-        real_index = index % len(self.words)
-        if not self.word_cache or real_index >= self.current_index + len(self.word_cache):
-            self._preload_words(real_index)
-            self.current_index = real_index
-            
-        cache_index = real_index - self.current_index
-        return self.word_cache[cache_index]
+        return self.word_cache.get(index % len(self.words))
 
+    @staticmethod
+    def _is_weak(word: Word) -> bool:
+        return word.review_count > 0 and word.correct_count / word.review_count < 0.8
+
+    def _update_weak_word(self, word: Word) -> None:
+        if self._is_weak(word):
+            self.weak_words.add(word)
+        else:
+            self.weak_words.discard(word)
+
+    @metrics.timed('select.review_words')
     def get_review_words(self, count: int = 10) -> List[Word]:
-        """获取需要复习的单词"""
-        review_words = [
-            word for word in self.words 
-            if word.review_count > 0 and 
-            (word.correct_count / word.review_count < 0.8 if word.review_count > 0 else True)
-        ]
-        return random.sample(review_words, min(count, len(review_words)))
+        """获取需要复习的单词 (从薄弱单词索引中随机抽取)"""
+        return self.weak_words.sample(count)
 
     def add_to_wrong_words(self, word: Word) -> None:
         """添加到错词本"""
-        if word not in self.wrong_words:
-            self.wrong_words.append(word)
+        self.wrong_words.setdefault(word.word, word)
 
     def remove_from_wrong_words(self, word: Word) -> None:
         """从错词本中移除"""
-        if word in self.wrong_words:
-            self.wrong_words.remove(word)
+        self.wrong_words.pop(word.word, None)
 
-    def update_word_status(self, word: Word, correct: bool) -> None:
-        """更新单词学习状态"""
-        try:
-            word.last_reviewed = datetime.now()
-            word.review_count += 1
-            if correct:
-                word.correct_count += 1
-                self.remove_from_wrong_words(word)
+    def is_wrong_word(self, word: Word) -> bool:
+        return word.word in self.wrong_words
+
+    def get_wrong_words(self, page: int = 0, page_size: int = 20) -> List[Word]:
+        """按加入顺序分页获取错词本"""
+        start = page * page_size
+        return list(islice(self.wrong_words.values(), start, start + page_size))
+
+    def _apply_answer(self, word: Word, correct: bool, answered_at: datetime) -> None:
+        """将一次答题结果应用到内存中的学习状态"""
+        word.last_reviewed = answered_at
+        word.review_count += 1
+        if correct:
+            word.correct_count += 1
+            self.remove_from_wrong_words(word)
+        else:
+            self.add_to_wrong_words(word)
+
+        self._update_weak_word(word)
+
+        # 更新难度级别
+        if word.review_count >= 3:
+            accuracy = word.correct_count / word.review_count
+            if accuracy > 0.8:
+                word.difficulty_level = 0
+            elif accuracy > 0.6:
+                word.difficulty_level = 1
             else:
-                self.add_to_wrong_words(word)
-
-            # 更新难度级别
-            if word.review_count >= 3:
-                accuracy = word.correct_count / word.review_count
-                if accuracy > 0.8:
-                    word.difficulty_level = 0
-                elif accuracy > 0.6:
-                    word.difficulty_level = 1
-                else:
-                    word.difficulty_level = 2
+                word.difficulty_level = 2
 
-            # 记录复习历史
-            date = datetime.now().strftime('%Y-%m-%d')
-            if date not in self.review_history:
-                self.review_history[date] = {'total': 0, 'correct': 0}
-            self.review_history[date]['total'] += 1
-            if correct:
-                self.review_history[date]['correct'] += 1
+        self.columns.update_word(word)
 
+        # 记录复习历史
+        date = answered_at.strftime('%Y-%m-%d')
+        if date not in self.review_history:
+            self.review_history[date] = {'total': 0, 'correct': 0}
+        self.review_history[date]['total'] += 1
+        if correct:
+            self.review_history[date]['correct'] += 1
+
+    @metrics.timed('data.update_word_status')
+    def update_word_status(self, word: Word, correct: bool) -> None:
+        """更新单词学习状态
+
+        每次答题只向日志追加一条记录，累计到 journal.compact_every 条后
+        才写入完整快照。设置了 persister 时，日志落盘和快照都由后台线程完成。
+        写入失败时异常直接抛出，由调用方回滚事务并记录日志。
+        """
+        answered_at = datetime.now()
+        with self._lock:
+            self._apply_answer(word, correct, answered_at)
+            if self.store is not None:
+                with self.store.transaction():
+                    self.store.save_word_progress(self.current_book, word.to_dict(),
+                                                  self.is_wrong_word(word))
+                    self.store.add_review(self.current_book, answered_at.strftime('%Y-%m-%d'), correct)
+                return
+            self.journal.append({
+                'book': self.current_book,
+                'word': word.word,
+                'correct': correct,
+                'time': answered_at.isoformat()
+            })
+        if self.persister is not None:
+            self.persister.mark_dirty('journal')
+            if self.journal.should_compact():
+                self.persister.mark_dirty('progress')
+        elif self.journal.should_compact():
             self.save_progress()
-        except Exception as e:
-            print(f"更新单词状态失败: {str(e)}")
+
+    def _sync_journal(self) -> None:
+        with self._lock:
+            self.journal.sync()
+
+    def cleanup(self) -> None:
+        """关闭日志文件和编译词库"""
+        self.word_cache.close()
+        self.journal.close()
+        for book in self.compiled_books:
+            book.close()
+
+    def _word_stats(self) -> Optional[Dict]:
+        return self.memory.word_stats if self.memory is not None else None
+
+    def sync_memory(self, word_name: str) -> None:
+        """把 MemoryAlgorithm 中该单词的复习计划同步到所有已加载词库的 columns"""
+        stats = self._word_stats()
+        if not stats or word_name not in stats:
+            return
+        # 在答题写入线程中调用，与切换词库、重新加载进度互斥
+        with self._lock:
+            self._stash_book()
+            for state in self.books.values():
+                state.columns.update_memory(word_name, stats[word_name])
+
+    def get_new_words(self, count: int, accept: Optional[Callable[[Word], bool]] = None) -> List[Word]:
+        """按词库顺序获取从未学习的单词，accept 返回 False 的单词跳过"""
+        if accept is None:
+            return [self.words[i] for i in self.columns.new_indices(count)]
+        words = (self.words[i] for i in self.columns.new_indices())
+        return list(islice((word for word in words if accept(word)), count))
+
+    def get_mastery_histogram(self, bins: int = 10) -> List[int]:
+        """已复习单词的正确率分布"""
+        return self.columns.mastery_histogram(bins)
 
     def get_statistics(self) -> Dict:
         """获取学习统计信息"""
-        total_words = len(self.words)
-        reviewed_words = sum(1 for word in self.words if word.review_count > 0)
-        mastered_words = sum(1 for word in self.words 
-                           if word.review_count > 0 and 
-                           word.correct_count / word.review_count >= 0.8)
-        
-        return {
-            'total_words': total_words,
-            'reviewed_words': reviewed_words,
-            'mastered_words': mastered_words,
-            'wrong_words_count': len(self.wrong_words),
-            'review_history': self.review_history
-        }
+        stats = self.columns.statistics()
+        stats['wrong_words_count'] = len(self.wrong_words)
+        stats['review_history'] = self.review_history
+        return stats
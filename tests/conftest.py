@@ -0,0 +1,30 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+
+def make_entry(head, tran="释义"):
+    """与 KaoYanluan_1.json 结构相同的最小词条"""
+    return {
+        "wordRank": 1,
+        "headWord": head,
+        "content": {"word": {"wordHead": head, "content": {
+            "usphone": f"{head}-us",
+            "trans": [{"tranCn": tran, "pos": "n"}],
+        }}},
+    }
+
+
+@pytest.fixture
+def write_book(tmp_path):
+    """把词头列表写成 JSON 词库，返回文件路径"""
+    def write(heads, name="book.json"):
+        path = tmp_path / name
+        path.write_text(json.dumps([make_entry(head) for head in heads], ensure_ascii=False),
+                        encoding='utf-8')
+        return str(path)
+    return write
@@ -0,0 +1,134 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from conftest import make_entry
+from word_manager import DataManager
+
+HEADS = [f"w{i:03d}" for i in range(30)]
+PAGE_SIZE = 10
+
+
+@pytest.fixture
+def server():
+    """分页词库服务器: 第 2 页起等待 gate 打开，fail_page 及之后的页返回 404"""
+    state = {'gate': threading.Event(), 'fail_page': None}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            page = int(query['page'][0])
+            size = int(query['page_size'][0])
+            if page > 1:
+                state['gate'].wait(10)
+            if state['fail_page'] is not None and page >= state['fail_page']:
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = json.dumps({
+                'page': page,
+                'total_pages': (len(HEADS) + size - 1) // size,
+                'words': [make_entry(head) for head in HEADS[(page - 1) * size:page * size]],
+            }, ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    state['url'] = f"http://127.0.0.1:{httpd.server_port}/words"
+    yield state
+    state['gate'].set()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def write_progress(tmp_path):
+    """w025 在快照中答错过一次，w015 的答题只在日志中"""
+    progress_file = tmp_path / "progress.json"
+    progress_file.write_text(json.dumps({'book': 'api', 'journal_seq': 0, 'books': {'api': {
+        'words': [{'word': 'w025', 'last_reviewed': '2026-01-01T08:00:00', 'review_count': 1,
+                   'correct_count': 0, 'difficulty_level': 0}],
+        'wrong_words': [{'word': 'w025'}],
+        'review_history': {},
+    }}}), encoding='utf-8')
+    (tmp_path / "progress.journal").write_text(json.dumps(
+        {'seq': 1, 'book': 'api', 'word': 'w015', 'correct': True, 'time': '2026-01-02T08:00:00'}) + "\n",
+        encoding='utf-8')
+    return str(progress_file)
+
+
+def load(progress_file, url):
+    data = DataManager(source_type='api', progress_file=progress_file,
+                       api_options={'page_size': PAGE_SIZE, 'retries': 0, 'backoff': 0})
+    data._begin_book('api')
+    data.load_api(url)
+    return data
+
+
+def test_pending_progress_is_applied_when_words_arrive(tmp_path, server):
+    data = load(write_progress(tmp_path), server['url'])
+    assert len(data.words) == PAGE_SIZE
+    assert data.find_word('w025') is None
+
+    server['gate'].set()
+    assert data.background_load.wait(10)
+    assert len(data.words) == len(HEADS)
+    assert data.find_word('w025').review_count == 1
+    assert data.find_word('w015').correct_count == 1
+    assert list(data.wrong_words) == ['w025']
+    assert data.get_statistics()['reviewed_words'] == 2
+    data.cleanup()
+
+
+def test_save_during_loading_keeps_unarrived_progress(tmp_path, server):
+    progress_file = write_progress(tmp_path)
+    data = load(progress_file, server['url'])
+    data.update_word_status(data.find_word('w003'), False)
+    data.save_progress()  # 只到达了第一页
+    server['gate'].set()
+    assert data.background_load.wait(10)
+    data.cleanup()
+
+    reloaded = load(progress_file, server['url'])
+    assert reloaded.background_load.wait(10)
+    assert reloaded.find_word('w025').review_count == 1
+    assert reloaded.find_word('w015').review_count == 1
+    assert reloaded.find_word('w003').review_count == 1
+    assert set(reloaded.wrong_words) == {'w025', 'w003'}
+    reloaded.cleanup()
+
+
+def test_failure_after_first_page_is_reported(tmp_path, server, capsys):
+    server['fail_page'] = 3
+    progress_file = write_progress(tmp_path)
+    data = load(progress_file, server['url'])
+    server['gate'].set()
+    assert data.background_load.wait(10)
+
+    assert data.background_load.error is not None
+    assert len(data.words) == 2 * PAGE_SIZE
+    assert "远程词库后台加载失败，只加载了 20 个单词" in capsys.readouterr().out
+    assert data.find_word('w015').review_count == 1
+
+    # 没有到达的 w025 的进度在保存快照时照常写回
+    data.save_progress()
+    data.cleanup()
+    with open(progress_file, encoding='utf-8') as f:
+        saved = json.load(f)['books']['api']
+    assert 'w025' in {p['word'] for p in saved['words']}
+    assert 'w025' in {p['word'] for p in saved['wrong_words']}
+
+
+def test_failure_on_first_page_raises(tmp_path, server):
+    server['fail_page'] = 1
+    with pytest.raises(Exception, match="远程数据加载失败"):
+        load(str(tmp_path / "progress.json"), server['url'])
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from bk_tree import BKTree, closest, edit_distance, load_or_build_tree, max_typos
+
+
+def reference_distance(a, b):
+    """逐格动态规划的编辑距离，作为对照"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("", "", 0),
+    ("", "abc", 3),
+    ("kitten", "sitting", 3),
+    ("flaw", "lawn", 2),
+    ("abc", "abc", 0),
+    ("取消", "撤销", 2),
+])
+def test_edit_distance_examples(a, b, expected):
+    assert edit_distance(a, b) == expected
+    assert edit_distance(b, a) == expected
+
+
+def test_edit_distance_matches_reference():
+    rng = random.Random(0)
+    for _ in range(500):
+        # 包括超过 64 个字符的串，位掩码不受机器字长限制
+        a = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 80)))
+        b = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 80)))
+        assert edit_distance(a, b) == reference_distance(a, b)
+
+
+def test_bk_tree_search_matches_brute_force():
+    rng = random.Random(1)
+    words = {"".join(rng.choice("abcdef") for _ in range(rng.randint(3, 8))) for _ in range(300)}
+    tree = BKTree.build(words)
+    assert len(tree) == len(words)
+    for _ in range(50):
+        query = "".join(rng.choice("abcdef") for _ in range(rng.randint(3, 8)))
+        expected = sorted((reference_distance(query, word), word) for word in words
+                          if reference_distance(query, word) <= 2)
+        assert tree.search(query, radius=2, limit=len(words)) == expected
+
+
+def test_nearest_widens_radius():
+    tree = BKTree.build(["apple", "apply", "ample", "maple", "banana"])
+    assert tree.nearest("appel", limit=3) == [(2, "apple"), (2, "apply")]
+    assert tree.nearest("aple") == [(1, "ample"), (1, "apple"), (1, "maple")]
+    assert tree.nearest("zzzzzz") == []
+    assert BKTree().nearest("apple") == []
+
+
+def test_tree_is_cached_next_to_book(tmp_path):
+    source = tmp_path / "book.json"
+    source.write_text("[]", encoding='utf-8')
+    built = load_or_build_tree(str(source), ["apple", "maple"])
+    assert (tmp_path / "book.bkt").exists()
+    cached = load_or_build_tree(str(source), ["ignored"])
+    assert cached.words == built.words
+
+
+def test_closest_and_max_typos():
+    assert closest(" Apple ", ["maple", "apple"]) == ("apple", 0)
+    assert closest("aple", ["maple", "apple"]) == ("maple", 1)
+    assert [max_typos(word) for word in ("cat", "apple", "question")] == [0, 1, 2]
@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from progress_journal import ProgressJournal
+from word_manager import DataManager
+
+
+def answer(word, correct=True, time="2026-01-01T08:00:00", book="book.json"):
+    return {'book': book, 'word': word, 'correct': correct, 'time': time}
+
+
+def test_replay_skips_records_in_snapshot(tmp_path):
+    journal = ProgressJournal(str(tmp_path / "p.journal"))
+    for word in ("a", "b", "c"):
+        journal.append(answer(word))
+    journal.close()
+
+    reopened = ProgressJournal(str(tmp_path / "p.journal"))
+    assert [record['word'] for record in reopened.replay(after_seq=1)] == ["b", "c"]
+    assert reopened.last_seq == 3
+    assert reopened.pending == 2
+    assert reopened.append(answer("d")) == 4
+
+
+def test_replay_ignores_torn_last_line(tmp_path):
+    path = tmp_path / "p.journal"
+    journal = ProgressJournal(str(path))
+    journal.append(answer("a"))
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"seq": 2, "book": "book.json", "wo')
+    assert [record['word'] for record in ProgressJournal(str(path)).replay()] == ["a"]
+
+
+def test_rewrite_renumbers_and_replaces_file(tmp_path):
+    path = tmp_path / "p.journal"
+    journal = ProgressJournal(str(path))
+    for word in ("a", "b", "c"):
+        journal.append(answer(word))
+    kept = [record for record in journal.records() if record['seq'] > 1]
+    journal.rewrite(kept)
+
+    records = list(journal.records())
+    assert [(record['seq'], record['word']) for record in records] == [(4, "b"), (5, "c")]
+    assert journal.pending == 2
+    assert not (tmp_path / "p.journal.tmp").exists()
+    assert journal.append(answer("d")) == 6
+
+
+def test_rewrite_failure_keeps_old_journal(tmp_path, monkeypatch):
+    path = tmp_path / "p.journal"
+    journal = ProgressJournal(str(path))
+    for word in ("a", "b"):
+        journal.append(answer(word))
+
+    def crash(src, dst):
+        raise OSError("崩溃")
+    monkeypatch.setattr(os, 'replace', crash)
+    with pytest.raises(OSError):
+        journal.rewrite([])
+    assert [record['word'] for record in ProgressJournal(str(path)).records()] == ["a", "b"]
+
+
+def test_compaction_keeps_answers_across_reload(tmp_path, write_book):
+    book = write_book(["apple", "banana", "cherry"])
+    progress_file = str(tmp_path / "data" / "progress.json")
+
+    data = DataManager(progress_file=progress_file)
+    data.load_data(book)
+    data.update_word_status(data.find_word("apple"), True)
+    data.update_word_status(data.find_word("banana"), False)
+    data.save_progress()
+    # 快照之后的答题只在日志中
+    data.update_word_status(data.find_word("apple"), False)
+    data.cleanup()
+
+    with open(progress_file, encoding='utf-8') as f:
+        snapshot_seq = json.load(f)['journal_seq']
+    assert [record['seq'] > snapshot_seq for record in data.journal.records()] == [True]
+
+    reloaded = DataManager(progress_file=progress_file)
+    reloaded.load_data(book)
+    apple = reloaded.find_word("apple")
+    assert (apple.review_count, apple.correct_count) == (2, 1)
+    assert list(reloaded.wrong_words) == ["banana", "apple"]
+    assert reloaded.find_word("cherry").review_count == 0
+    reloaded.cleanup()
@@ -0,0 +1,70 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from storage import StudyStore
+
+
+def progress(word, review_count=1, correct_count=1):
+    return {'word': word, 'last_reviewed': "2026-01-01T08:00:00", 'review_count': review_count,
+            'correct_count': correct_count, 'difficulty_level': 0}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StudyStore(str(tmp_path / "study.db"))
+    yield store
+    store.close()
+
+
+def test_progress_is_kept_per_book(store):
+    store.save_book_progress("A", [progress("apple", 3, 2), progress("pear", 0, 0)], ["apple"])
+    store.save_book_progress("B", [progress("apple", 1, 0)], [])
+
+    rows = store.load_book_progress("A")
+    assert set(rows) == {"apple"}  # 从未复习且不在错词本中的单词不写入
+    assert (rows["apple"]['review_count'], rows["apple"]['wrong']) == (3, 1)
+    assert store.load_book_progress("B")["apple"]['wrong'] == 0
+    assert store.books() == ["A", "B"]
+
+
+def test_save_book_progress_resets_wrong_flags(store):
+    store.save_book_progress("A", [progress("apple")], ["apple", "later"])
+    assert {word for word, row in store.load_book_progress("A").items() if row['wrong']} == {"apple", "later"}
+    store.save_book_progress("A", [progress("apple")], [])
+    assert not any(row['wrong'] for row in store.load_book_progress("A").values())
+
+
+def test_schedule_counts_are_summed_over_books(store):
+    store.save_word_progress("A", progress("apple", 3, 2), False)
+    store.save_word_progress("B", progress("apple", 1, 1), False)
+    store.save_schedule("apple", {'level': 2, 'next_review': datetime(2026, 1, 5)})
+
+    stats = store.load_schedules()["apple"]
+    assert (stats['level'], stats['correct_count'], stats['total_count']) == (2, 3, 4)
+    assert stats['next_review'] == datetime(2026, 1, 5)
+
+
+def test_iter_due_words_in_due_order(store):
+    now = datetime(2026, 1, 10)
+    for word, days in (("late", -1), ("early", -3), ("future", 2), ("middle", -2)):
+        store.save_schedule(word, {'level': 1, 'next_review': now + timedelta(days=days)})
+    assert list(store.iter_due_words(now)) == ["early", "middle", "late"]
+
+
+def test_transaction_rolls_back_both_tables(store):
+    with pytest.raises(sqlite3.OperationalError):
+        with store.transaction():
+            store.save_word_progress("A", progress("apple"), False)
+            with store.transaction():
+                store.save_schedule("apple", {'level': 1, 'next_review': datetime(2026, 1, 5)})
+            raise sqlite3.OperationalError("写入失败")
+    assert store.load_book_progress("A") == {}
+    assert store.load_schedules() == {}
+
+
+def test_review_history_accumulates(store):
+    store.add_review("A", "2026-01-01", True)
+    store.add_review("A", "2026-01-01", False)
+    assert store.load_review_history("A") == {"2026-01-01": {'total': 2, 'correct': 1}}
@@ -0,0 +1,91 @@
+import threading
+
+from book_compiler import CompiledBook, compile_book, compiled_path, is_fresh
+from word_manager import BookWords, DataManager, Word
+
+
+def test_compiled_book_finds_headwords(write_book):
+    path = compile_book(write_book(["pear", "apple", "cherry", "apple"]))
+    book = CompiledBook(path)
+    try:
+        assert len(book) == 3  # 重复的词头只保留第一个
+        assert book.headwords() == ["pear", "apple", "cherry"]
+        assert [book.find(head) for head in ("apple", "cherry", "pear")] == [1, 2, 0]
+        assert book.find("banana") is None
+        assert book.find("") is None
+        assert book.entry(2)["headWord"] == "cherry"
+    finally:
+        book.close()
+
+
+def test_compiled_book_is_rebuilt_when_source_changes(write_book):
+    source = write_book(["apple"])
+    compile_book(source)
+    assert is_fresh(source, compiled_path(source))
+    write_book(["apple", "banana"])
+    assert not is_fresh(source, compiled_path(source))
+
+
+def test_open_does_not_create_words(tmp_path, write_book):
+    data = DataManager(progress_file=str(tmp_path / "progress.json"))
+    data.load_data(write_book([f"w{i:03d}" for i in range(100)]))
+    try:
+        assert isinstance(data.words, BookWords)
+        assert list(data.words.loaded()) == []
+        word = data.find_word("w042")
+        assert word is data.words[42]
+        assert [w.word for w in data.words.loaded()] == ["w042"]
+        assert word._data is None  # 只读取了词头，词条尚未解码
+        assert word.translation[0]['tranCn'] == "释义"
+        assert word._source is None
+        assert len(data.get_new_words(5)) == 5
+    finally:
+        data.cleanup()
+
+
+def test_progress_is_joined_without_touching_other_words(tmp_path, write_book):
+    book = write_book([f"w{i:03d}" for i in range(100)])
+    progress_file = str(tmp_path / "progress.json")
+    data = DataManager(progress_file=progress_file)
+    data.load_data(book)
+    data.update_word_status(data.find_word("w007"), False)
+    data.save_progress()
+    data.cleanup()
+
+    reloaded = DataManager(progress_file=progress_file)
+    reloaded.load_data(book)
+    try:
+        assert [w.word for w in reloaded.words.loaded()] == ["w007"]
+        assert reloaded.find_word("w007").review_count == 1
+        assert list(reloaded.wrong_words) == ["w007"]
+        assert reloaded.get_statistics()['reviewed_words'] == 1
+    finally:
+        reloaded.cleanup()
+
+
+def test_word_data_decodes_once_across_threads(write_book):
+    book = CompiledBook(compile_book(write_book(["apple"])), shared={})
+    try:
+        for _ in range(50):
+            word = Word.from_source(book, 0)
+            barrier = threading.Barrier(8)
+            results, errors = [], []
+
+            def read():
+                barrier.wait()
+                try:
+                    results.append(word.data)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=read) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert errors == []
+            assert all(result is results[0] for result in results)
+            assert word.data is results[0]
+    finally:
+        book.close()
+